@@ -5,7 +5,7 @@ from ui_components import SongDialog
 
 class AdminController:
     """Controller untuk fitur admin"""
-    def _init_(self, app):
+    def __init__(self, app):
         self.app = app
     
     def show_add_song_dialog(self):
@@ -37,19 +37,22 @@ class AdminController:
         }
         
         self.app.library.append(new_song)
-        self.app.save_to_json()
-        self.app.refresh_song_list()
+        self.app.song_added(new_song)
+        self.app.save_to_json({'op': 'song_add', 'song': new_song})
+        if self.app.showing_full_library:
+            self.app.song_list.insert_song(len(self.app.song_list.songs), new_song)
+        elif self.app.current_view == 'library':
+            self.app.refresh_song_list()  # Cek ulang filter/pencarian yang aktif
         messagebox.showinfo("Sukses", "Lagu berhasil ditambahkan!")
     
     def edit_selected_song(self):
         """Edit lagu yang dipilih"""
-        selection = self.app.tree.selection()
-        if not selection:
+        selected = self.app.song_list.selected_song()
+        if not selected:
             return
         
-        values = self.app.tree.item(selection[0])['values']
-        song_id = values[0]
-        song = next((s for s in self.app.library if s['id'] == song_id), None)
+        song_id = selected['id']
+        song = self.app.song_index.get(song_id)
         
         if not song:
             return
@@ -60,42 +63,39 @@ class AdminController:
         if not result:
             return
         
-        # Update song data
+        # Update song data (playlist memakai record yang sama, otomatis ikut berubah)
+        old_id = song['id']
         song.update(result)
+        self.app.song_updated(song, old_id)
         
-        # Update di semua playlist
-        for playlist in self.app.playlists.values():
-            current = playlist.head
-            while current:
-                if current.data['id'] == song_id:
-                    current.data = song.copy()
-                current = current.next
-        
-        self.app.save_to_json()
-        self.app.refresh_song_list()
+        self.app.save_to_json({'op': 'song_update', 'song': song})
+        self.app.song_list.update_song(song, old_id, **self.app.list_placement(song))
         messagebox.showinfo("Sukses", "Lagu berhasil diupdate!")
     
     def delete_selected_song(self):
         """Hapus lagu yang dipilih"""
-        selection = self.app.tree.selection()
-        if not selection:
+        selected = self.app.song_list.selected_song()
+        if not selected:
             return
         
-        values = self.app.tree.item(selection[0])['values']
-        song_id = values[0]
-        song = next((s for s in self.app.library if s['id'] == song_id), None)
+        song_id = selected['id']
+        song = self.app.song_index.get(song_id)
         
         if not song:
             return
         
         if messagebox.askyesno("Konfirmasi", 
                               f"Hapus '{song['title']}' dari library?\nLagu juga akan terhapus dari semua playlist."):
-            self.app.library = [s for s in self.app.library if s['id'] != song_id]
-            self.app.save_to_json()
+            if self.app.shuffle is not None:
+                self.app.shuffle.detach()  # Urutan acak membaca library langsung
+            self.app.library.remove(song)
+            self.app.song_removed(song_id)
             
             # Hapus dari semua playlist
             for playlist in self.app.playlists.values():
-                playlist.remove(song_id)
+                playlist.remove_all(song_id)
+            
+            self.app.save_to_json({'op': 'song_delete', 'id': song_id})
             
             # Reset current song jika yang dihapus sedang diputar
             if self.app.current_song and self.app.current_song['id'] == song_id:
@@ -103,5 +103,5 @@ class AdminController:
                 self.app.is_playing = False
                 self.app.update_player_ui()
             
-            self.app.refresh_song_list()
+            self.app.song_list.remove_song(song_id, every=True)
             messagebox.showinfo("Sukses", "Lagu berhasil dihapus!")
\ No newline at end of file
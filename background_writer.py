@@ -0,0 +1,72 @@
+import threading
+import queue
+
+
+class BackgroundWriter:
+    """Thread penulis di background agar penyimpanan tidak memblokir UI
+
+    Setiap pekerjaan punya key; jika key yang sama dikirim lagi sebelum
+    sempat ditulis, hanya pekerjaan terbaru yang dijalankan (coalesce).
+    Error tidak dilempar di thread ini, tapi dikumpulkan untuk diambil
+    oleh thread UI lewat poll_errors().
+    """
+    def __init__(self):
+        self._pending = {}  # key -> callable
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._errors = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='BackgroundWriter',
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, key, job):
+        """Jadwalkan job (callable tanpa argumen), menggantikan job lama dengan key sama"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BackgroundWriter sudah ditutup")
+            self._pending[key] = job
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Tunggu sampai semua job selesai ditulis"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy,
+                                       timeout)
+
+    def close(self, timeout=None):
+        """Flush lalu hentikan thread (dipanggil saat aplikasi ditutup)"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def poll_errors(self):
+        """Ambil semua error yang terjadi sejak pemanggilan terakhir"""
+        errors = []
+        while True:
+            try:
+                errors.append(self._errors.get_nowait())
+            except queue.Empty:
+                return errors
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                jobs = list(self._pending.values())
+                self._pending.clear()
+                self._busy = True
+
+            for job in jobs:
+                try:
+                    job()
+                except Exception as e:
+                    self._errors.put(e)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
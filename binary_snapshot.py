@@ -0,0 +1,177 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'MPSNAP01'
+# magic, json_mtime_ns, json_size, journal_seq, n_strings, n_songs, n_playlists
+HEADER = struct.Struct('<8sqqqIII')
+# id, title, artist, genre, album, duration, image_path, year, favorite
+SONG_ROW = struct.Struct('<qIIIIIIiB')
+# name, image_path, description, jumlah lagu
+PLAYLIST_ROW = struct.Struct('<IIII')
+NONE = 0xFFFFFFFF  # index string untuk nilai None
+
+SONG_FIELDS = ('id', 'title', 'artist', 'genre', 'album', 'duration',
+               'image_path', 'year', 'favorite')
+
+
+class BinarySnapshot:
+    """Snapshot biner (mmap) dari music_data.json untuk startup cepat
+
+    Semua string (judul, artis, genre, album, path, ...) disimpan sekali di
+    tabel string dan di-intern saat dibaca; setiap lagu adalah baris
+    berukuran tetap, dan playlist disimpan sebagai array index lagu.
+    Record dibaca sesuai kebutuhan lewat song(i).
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.json_mtime_ns, self.json_size, self.journal_seq,
+         n_strings, self.song_count, self.playlist_count) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError("Bukan file snapshot musik")
+
+        offset = HEADER.size
+        self._string_offsets = memoryview(self._mm)[offset:offset + 4 * (n_strings + 1)].cast('I')
+        offset += 4 * (n_strings + 1)
+        self._strings_start = offset
+        offset += self._string_offsets[n_strings]
+        self._songs_start = offset
+        self._playlists_start = offset + SONG_ROW.size * self.song_count
+        self._strings = [None] * n_strings
+
+    @classmethod
+    def open_if_fresh(cls, path, json_path):
+        """Buka snapshot hanya jika masih sesuai dengan file JSON; None jika basi"""
+        try:
+            snapshot = cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        try:
+            stat = os.stat(json_path)
+        except OSError:
+            stat = None
+        if stat is None or (stat.st_mtime_ns, stat.st_size) != (snapshot.json_mtime_ns,
+                                                                 snapshot.json_size):
+            snapshot.close()
+            return None
+        return snapshot
+
+    def close(self):
+        self._string_offsets.release()
+        self._mm.close()
+
+    def string(self, index):
+        if index == NONE:
+            return None
+        value = self._strings[index]
+        if value is None:
+            start = self._strings_start + self._string_offsets[index]
+            end = self._strings_start + self._string_offsets[index + 1]
+            value = sys.intern(self._mm[start:end].decode('utf-8'))
+            self._strings[index] = value
+        return value
+
+    def song(self, index):
+        """Bangun record lagu ke-index (urutan library)"""
+        (song_id, title, artist, genre, album, duration, image_path,
+         year, favorite) = SONG_ROW.unpack_from(self._mm, self._songs_start + SONG_ROW.size * index)
+        return {
+            'id': song_id,
+            'title': self.string(title),
+            'artist': self.string(artist),
+            'genre': self.string(genre),
+            'album': self.string(album),
+            'year': year,
+            'duration': self.string(duration),
+            'favorite': bool(favorite),
+            'image_path': self.string(image_path)
+        }
+
+    def iter_songs(self):
+        """Yield semua record lagu berurutan, dibaca dari mmap saat dibutuhkan
+
+        Baris dibaca satu per satu dan string didekode lewat string() saat
+        pertama dipakai, jadi tidak ada yang dibangun di depan.
+        """
+        string = self.string
+        rows = memoryview(self._mm)[self._songs_start:self._playlists_start]
+        try:
+            for (song_id, title, artist, genre, album, duration, image_path,
+                 year, favorite) in SONG_ROW.iter_unpack(rows):
+                yield {
+                    'id': song_id,
+                    'title': string(title),
+                    'artist': string(artist),
+                    'genre': string(genre),
+                    'album': string(album),
+                    'year': year,
+                    'duration': string(duration),
+                    'favorite': bool(favorite),
+                    'image_path': string(image_path)
+                }
+        finally:
+            rows.release()
+
+    def iter_playlists(self):
+        """Yield (name, image_path, description, array index lagu)"""
+        offset = self._playlists_start
+        for _ in range(self.playlist_count):
+            name, image_path, description, count = PLAYLIST_ROW.unpack_from(self._mm, offset)
+            offset += PLAYLIST_ROW.size
+            indexes = array('I', self._mm[offset:offset + 4 * count])
+            offset += 4 * count
+            yield self.string(name), self.string(image_path), self.string(description) or "", indexes
+
+
+def can_write(data):
+    """Snapshot biner hanya bisa menyimpan record dengan field standar"""
+    library_ids = set()
+    for song in data['library']:
+        if not set(song) <= set(SONG_FIELDS) or not isinstance(song.get('id'), int) \
+                or not isinstance(song.get('year'), int):
+            return False
+        library_ids.add(song['id'])
+    return all(isinstance(entry, int) and entry in library_ids
+               for content in data['playlists'].values() for entry in content['songs'])
+
+
+def pack_snapshot(data, json_path):
+    """Ubah data hasil DataManager.build_snapshot() menjadi bytes snapshot"""
+    strings = {}
+    blob = bytearray()
+    offsets = array('I', [0])
+
+    def intern(value):
+        if value is None:
+            return NONE
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(offsets) - 1
+            blob.extend(str(value).encode('utf-8'))
+            offsets.append(len(blob))
+        return index
+
+    rows = bytearray()
+    position = {}
+    for i, song in enumerate(data['library']):
+        position[song['id']] = i
+        rows += SONG_ROW.pack(song['id'], intern(song.get('title')), intern(song.get('artist')),
+                              intern(song.get('genre')), intern(song.get('album')),
+                              intern(song.get('duration')), intern(song.get('image_path')),
+                              song.get('year', 0), bool(song.get('favorite', False)))
+
+    playlists = bytearray()
+    for name, content in data['playlists'].items():
+        indexes = array('I', (position[song_id] for song_id in content['songs']))
+        playlists += PLAYLIST_ROW.pack(intern(name), intern(content['image_path']),
+                                       intern(content['description']), len(indexes))
+        playlists += indexes.tobytes()
+
+    stat = os.stat(json_path)
+    header = HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, data['journal_seq'],
+                         len(offsets) - 1, len(data['library']), len(data['playlists']))
+    return header + offsets.tobytes() + bytes(blob) + bytes(rows) + bytes(playlists)
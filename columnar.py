@@ -0,0 +1,231 @@
+import re
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsional; tanpa NumPy aplikasi memakai list biasa
+    np = None
+
+CATEGORY_FIELDS = ('title', 'artist', 'genre', 'album')
+FILTER_FIELDS = ('year', 'artist', 'genre', 'album')
+FILTER_PATTERN = re.compile(r'\b(%s):("[^"]*"|\S+)' % '|'.join(FILTER_FIELDS), re.IGNORECASE)
+
+
+def duration_seconds(value):
+    """Ubah durasi 'm:ss' (atau 'h:mm:ss') menjadi detik; 0 jika tidak valid"""
+    try:
+        seconds = 0
+        for part in str(value).strip().split(':'):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    except ValueError:
+        return 0
+
+
+def normalize(value):
+    """Nilai kategori yang dibandingkan (sama dengan key .lower() di sort_songs)"""
+    return str(value or '').lower()
+
+
+def parse_field_filters(text):
+    """Pisahkan filter field dari teks pencarian
+    
+    Contoh: 'year:2000-2010 genre:pop love' -> ([('year', (2000, 2010)),
+    ('genre', 'pop')], 'love'). Nilai bersepasi ditulis dengan tanda kutip,
+    mis. artist:"green day". Tanpa filter, teks dikembalikan apa adanya.
+    """
+    filters = []
+    for field, value in FILTER_PATTERN.findall(text):
+        field = field.lower()
+        value = value.strip('"')
+        if field == 'year':
+            start, _, end = value.partition('-')
+            start = int(start) if start.isdigit() else None
+            end = (int(end) if end.isdigit() else None) if _ else start
+            value = (start, end)
+        filters.append((field, value))
+    if not filters:
+        return filters, text
+    return filters, FILTER_PATTERN.sub('', text).strip()
+
+
+def matches_filters(song, filters):
+    """Versi Python murni dari ColumnarLibrary.filter_mask untuk satu lagu"""
+    for field, value in filters:
+        if field == 'year':
+            year = as_int(song.get('year'))
+            if (value[0] is not None and year < value[0]) or \
+                    (value[1] is not None and year > value[1]):
+                return False
+        elif normalize(song.get(field)).strip() != normalize(value).strip():
+            return False
+    return True
+
+
+def as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ColumnarLibrary:
+    """Library dalam bentuk kolom (satu array NumPy per field)
+
+    Menyimpan id, tahun dan durasi (detik) sebagai array int, serta kode
+    kategori untuk title/artist/genre/album. Record aslinya tetap di list
+    `rows`; hasil filter dikembalikan sebagai mask/index baris yang bisa
+    diubah menjadi record lewat take(); count_by() menghitung jumlah lagu
+    per nilai kategori.
+
+    Kolom dibangun penuh hanya setelah invalidate() (load, urutan library
+    berubah). Tambah/ubah/hapus satu lagu cukup memperbarui barisnya lewat
+    add()/update()/remove(); nilai kategori baru mendapat kode berikutnya.
+    """
+    def __init__(self, rows):
+        self.rows = rows
+        self._dirty = True
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def invalidate(self, rows=None):
+        """Tandai kolom perlu dibangun ulang (dipanggil setelah library berubah)"""
+        if rows is not None:
+            self.rows = rows
+        self._dirty = True
+
+    def ensure(self):
+        """Bangun kolom jika perlu; setelahnya ids/years/durations/codes siap dibaca"""
+        if not self._dirty:
+            return
+        rows = self.rows
+        n = len(rows)
+        self.ids = np.fromiter((as_int(s['id']) for s in rows), dtype=np.int64, count=n)
+        self.years = np.fromiter((as_int(s.get('year')) for s in rows), dtype=np.int32, count=n)
+        self.durations = np.fromiter((duration_seconds(s.get('duration')) for s in rows),
+                                     dtype=np.int32, count=n)
+        self.categories = {}
+        self.codes = {}
+        self._lookup = {}  # field -> {nilai: kode}
+        for field in CATEGORY_FIELDS:
+            values = np.array([normalize(s.get(field)) for s in rows], dtype=object)
+            if n:
+                categories, codes = np.unique(values, return_inverse=True)
+            else:
+                categories, codes = np.array([], dtype=object), np.array([], dtype=np.intp)
+            self.categories[field] = categories
+            self.codes[field] = codes.astype(np.int32).ravel()
+            self._lookup[field] = {value: code for code, value in enumerate(categories)}
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ==================== PEMELIHARAAN ====================
+    def add(self, song):
+        """Lagu baru sudah ditambahkan di akhir rows"""
+        if self._dirty:
+            return
+        self.ids = self._append(self.ids, as_int(song['id']))
+        self.years = self._append(self.years, as_int(song.get('year')))
+        self.durations = self._append(self.durations, duration_seconds(song.get('duration')))
+        for field in CATEGORY_FIELDS:
+            self.codes[field] = self._append(self.codes[field], self._code(field, song))
+
+    def update(self, song, old_id=None):
+        """Record lagu diubah di tempat (posisinya di rows tetap)"""
+        if self._dirty:
+            return
+        row = self._row(song['id'] if old_id is None else old_id)
+        if row is None:
+            self._dirty = True
+            return
+        self.ids[row] = as_int(song['id'])
+        self.years[row] = as_int(song.get('year'))
+        self.durations[row] = duration_seconds(song.get('duration'))
+        for field in CATEGORY_FIELDS:
+            self.codes[field][row] = self._code(field, song)
+
+    def remove(self, song_id):
+        """Lagu sudah dihapus dari rows; buang barisnya dari setiap kolom"""
+        if self._dirty:
+            return
+        row = self._row(song_id)
+        if row is None:
+            self._dirty = True
+            return
+        self.ids = np.delete(self.ids, row)
+        self.years = np.delete(self.years, row)
+        self.durations = np.delete(self.durations, row)
+        for field in CATEGORY_FIELDS:
+            self.codes[field] = np.delete(self.codes[field], row)
+
+    def _row(self, song_id):
+        rows = np.flatnonzero(self.ids == as_int(song_id))
+        return int(rows[0]) if len(rows) else None
+
+    def _code(self, field, song):
+        """Kode kategori nilai field lagu (nilai baru ditambahkan di akhir)"""
+        value = normalize(song.get(field))
+        lookup = self._lookup[field]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.categories[field])
+            self.categories[field] = self._append(self.categories[field], value)
+        return code
+
+    @staticmethod
+    def _append(column, value):
+        return np.concatenate((column, np.array([value], dtype=column.dtype)))
+
+    # ==================== FILTER ====================
+    def all(self):
+        self.ensure()
+        return np.ones(len(self.rows), dtype=bool)
+
+    def filter_year_range(self, start=None, end=None):
+        """Mask lagu dengan start <= tahun <= end"""
+        self.ensure()
+        mask = np.ones(len(self.rows), dtype=bool)
+        if start is not None:
+            mask &= self.years >= start
+        if end is not None:
+            mask &= self.years <= end
+        return mask
+
+    def filter_equals(self, field, value):
+        """Mask lagu dengan field (artist/genre/album/title) sama dengan value"""
+        self.ensure()
+        # Spasi di ujung diabaikan ("Green Day " == "green day")
+        value = normalize(value).strip()
+        matches = [code for code, category in enumerate(self.categories[field])
+                   if category.strip() == value]
+        return np.isin(self.codes[field], matches)
+
+    def filter_mask(self, filters):
+        """Gabungkan (AND) hasil parse_field_filters menjadi satu mask"""
+        mask = self.all()
+        for field, value in filters:
+            if field == 'year':
+                mask &= self.filter_year_range(*value)
+            else:
+                mask &= self.filter_equals(field, value)
+        return mask
+
+    # ==================== AGREGASI ====================
+    def count_by(self, field, mask=None):
+        """Jumlah lagu per nilai kategori (dinormalisasi), {nilai: jumlah}"""
+        self.ensure()
+        codes = self.codes[field] if mask is None else self.codes[field][mask]
+        counts = np.bincount(codes, minlength=len(self.categories[field]))
+        categories = self.categories[field]
+        return {categories[code]: int(counts[code]) for code in np.flatnonzero(counts).tolist()}
+
+    # ==================== HASIL ====================
+    def take(self, index):
+        """Ubah index baris (array/mask) menjadi list record"""
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        rows = self.rows
+        return [rows[i] for i in index.tolist()]
@@ -0,0 +1,223 @@
+import hashlib
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from PIL import Image, ImageTk
+
+# Ukuran thumbnail yang dipakai UI: player bar dan header playlist
+THUMB_SIZES = ((60, 60), (150, 150))
+CACHE_DIR = '.thumb_cache'
+
+
+class ThumbnailCache:
+    """Cache thumbnail cover per (path, mtime, ukuran) dengan worker pool
+
+    Tiga lapis: LRU PhotoImage yang siap dipakai di memori, lalu file PNG
+    yang sudah di-resize di CACHE_DIR, baru terakhir decode dan resize
+    LANCZOS dari file aslinya. Dua lapis terakhir (serta os.stat, yang bisa
+    lambat di drive jaringan) dikerjakan thread worker; hasilnya (gambar
+    PIL) dikirim lewat queue yang dibaca thread UI dengan root.after, karena
+    PhotoImage hanya boleh dibuat di thread UI.
+
+    Setiap permintaan milik sebuah slot tampilan ('player', 'header').
+    Permintaan baru untuk slot yang sama membuat permintaan lama basi:
+    hasilnya tetap masuk cache, tapi callback-nya tidak dipanggil.
+    Path yang tidak ada atau gagal dibuka dicatat (negative cache) dan
+    baru dicek lagi setelah recheck_after detik. warm() memuat cover lebih
+    awal (prefetch) dengan prioritas di bawah permintaan tampilan.
+    """
+    def __init__(self, root, cache_dir=CACHE_DIR, capacity=128, recheck_after=60.0,
+                 workers=2, poll_ms=30, placeholder_color='#282828'):
+        self.root = root
+        self.cache_dir = cache_dir
+        self.capacity = capacity
+        self.recheck_after = recheck_after
+        self.poll_ms = poll_ms
+        self.placeholder_color = placeholder_color
+        self._images = OrderedDict()  # (path, ukuran) -> (mtime_ns, PhotoImage, waktu dicek)
+        self._missing = {}  # path -> waktu terakhir dicek
+        self._placeholders = {}  # ukuran -> PhotoImage
+        self._slots = {}  # slot -> generasi permintaan terbaru
+        self._callbacks = {}  # slot -> callback permintaan terbaru
+        self._warming = set()  # (path, ukuran) yang sedang di-prefetch
+        self._pending = 0
+        self._poll_job = None
+        self.hits = 0    # request() yang langsung dapat cover dari memori
+        self.misses = 0  # request() yang harus menunggu worker
+        self._seq = itertools.count()
+        self._jobs = queue.PriorityQueue()  # (prioritas, urutan, job)
+        self._results = queue.Queue()
+        self._threads = [threading.Thread(target=self._work, name=f'ThumbnailWorker-{i}',
+                                          daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def request(self, slot, path, size, callback):
+        """Thumbnail untuk slot; hasilnya langsung jika sudah ada di memori
+
+        Mengembalikan PhotoImage dari cache, None jika tidak ada gambar,
+        atau placeholder jika cover sedang dimuat; untuk yang terakhir
+        callback(PhotoImage atau None) dipanggil di thread UI saat hasilnya
+        tiba, kecuali slot sudah meminta gambar lain.
+        """
+        generation = self.cancel(slot)
+        if not path:
+            return None
+        now = time.monotonic()
+        checked = self._missing.get(path)
+        if checked is not None and now - checked < self.recheck_after:
+            return None
+
+        entry = self._images.get((path, size))
+        if entry is not None:
+            self.hits += 1
+            self._images.move_to_end((path, size))
+            if now - entry[2] >= self.recheck_after:
+                # Tampilkan yang ada sekarang; worker memeriksa apakah file berubah
+                self._submit(slot, generation, path, size, callback)
+            return entry[1]
+
+        self.misses += 1
+        self._submit(slot, generation, path, size, callback)
+        return self.placeholder(size)
+
+    def warm(self, path, size):
+        """Muat cover ke cache di background tanpa menampilkannya (prefetch)"""
+        if not path or (path, size) in self._images or (path, size) in self._warming:
+            return
+        checked = self._missing.get(path)
+        if checked is not None and time.monotonic() - checked < self.recheck_after:
+            return
+        self._warming.add((path, size))
+        self._submit(None, None, path, size, None, priority=1)
+
+    def cancel(self, slot):
+        """Batalkan permintaan slot yang belum selesai; kembalikan generasi baru"""
+        generation = self._slots[slot] = self._slots.get(slot, 0) + 1
+        self._callbacks.pop(slot, None)
+        return generation
+
+    def placeholder(self, size):
+        image = self._placeholders.get(size)
+        if image is None:
+            image = ImageTk.PhotoImage(Image.new('RGB', size, self.placeholder_color))
+            self._placeholders[size] = image
+        return image
+
+    def forget(self, path):
+        """Buang path dari negative cache (mis. setelah admin memilih gambar baru)"""
+        self._missing.pop(path, None)
+
+    def close(self):
+        """Hentikan worker (dipanggil saat aplikasi ditutup)"""
+        for _ in self._threads:
+            self._jobs.put((-1, next(self._seq), None))
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+
+    # ==================== WORKER ====================
+    def _submit(self, slot, generation, path, size, callback, priority=0):
+        if slot is not None:
+            self._callbacks[slot] = callback
+        self._jobs.put((priority, next(self._seq), (slot, generation, path, size)))
+        self._pending += 1
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_ms, self._poll)
+
+    def _work(self):
+        while True:
+            _, _, job = self._jobs.get()
+            if job is None:
+                return
+            slot, generation, path, size = job
+            if self._slots.get(slot) != generation:
+                # Sudah dilewati (mis. lagu di-skip) sebelum sempat dimuat
+                self._results.put((slot, generation, path, size, None, None, None))
+                continue
+            try:
+                stat = os.stat(path)
+                self._results.put((slot, generation, path, size, stat.st_mtime_ns,
+                                   self.load(path, size, stat), None))
+            except Exception as e:
+                self._results.put((slot, generation, path, size, None, None, e))
+
+    def _poll(self):
+        """Ambil hasil worker di thread UI, lalu panggil callback yang masih berlaku"""
+        self._poll_job = None
+        now = time.monotonic()
+        while True:
+            try:
+                slot, generation, path, size, mtime, thumb, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            self._warming.discard((path, size))
+            image = None
+            if error is not None:
+                if not isinstance(error, FileNotFoundError):
+                    print(f"Error thumbnail {path}: {error}")
+                self._missing[path] = now
+                self._images.pop((path, size), None)
+            elif thumb is not None:
+                self._missing.pop(path, None)
+                entry = self._images.get((path, size))
+                # File tidak berubah: PhotoImage lama tetap dipakai
+                image = entry[1] if entry is not None and entry[0] == mtime else \
+                    ImageTk.PhotoImage(thumb)
+                self._images[(path, size)] = (mtime, image, now)
+                self._images.move_to_end((path, size))
+                if len(self._images) > self.capacity:
+                    self._images.popitem(last=False)
+            else:
+                continue  # Dilewati worker karena basi, tidak ada yang perlu diberi tahu
+            if self._slots.get(slot) == generation:
+                callback = self._callbacks.pop(slot, None)
+                if callback is not None:
+                    callback(image)
+        if self._pending:
+            self._poll_job = self.root.after(self.poll_ms, self._poll)
+
+    # ==================== DISK ====================
+    def load(self, path, size, stat=None):
+        """Thumbnail PIL berukuran size (dari disk cache jika ada)
+
+        Tidak menyentuh Tkinter, jadi aman dipanggil di luar thread UI.
+        Satu kali decode file asli langsung menyimpan semua THUMB_SIZES.
+        """
+        stat = stat or os.stat(path)
+        cached = self._cache_path(path, stat, size)
+        try:
+            img = Image.open(cached)
+            img.load()  # Membaca data sekaligus menutup file
+            return img
+        except OSError:
+            pass
+
+        with Image.open(path) as img:
+            # JPEG bisa di-decode langsung dalam resolusi kecil
+            img.draft('RGB', max(THUMB_SIZES))
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA')
+            thumbs = {s: img.resize(s, Image.Resampling.LANCZOS)
+                      for s in set(THUMB_SIZES) | {size}}
+        for s, thumb in thumbs.items():
+            self._save(thumb, self._cache_path(path, stat, s))
+        return thumbs[size]
+
+    def _cache_path(self, path, stat, size):
+        name = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{size[0]}x{size[1]}"
+        return os.path.join(self.cache_dir, hashlib.sha1(name.encode('utf-8')).hexdigest() + '.png')
+
+    def _save(self, thumb, cached):
+        # Disk cache hanya optimasi: gagal menulis tidak dianggap error
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp = f"{cached}.{threading.get_ident()}.tmp"
+            thumb.save(temp, 'PNG')
+            os.replace(temp, cached)
+        except OSError:
+            pass
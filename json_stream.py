@@ -0,0 +1,119 @@
+import codecs
+import json
+import os
+import re
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_CHARS = re.compile(r'[-+0-9.eE]*')
+
+
+class JsonStream:
+    """Pembaca JSON bertahap (streaming) untuk file berukuran besar
+
+    Hanya potongan file (chunk) dan satu elemen yang sedang dibaca yang
+    disimpan di memori, bukan seluruh dokumen. Pemanggil menelusuri
+    struktur lewat iter_object()/iter_array() dan mengambil nilai dengan
+    value().
+    """
+    def __init__(self, path, chunk_size=64 * 1024):
+        self._file = open(path, 'rb')
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(path)
+        self.read_bytes = 0
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def progress(self):
+        """Persentase file yang sudah dibaca (0.0 - 1.0)"""
+        if not self.total_bytes:
+            return 1.0
+        return self.read_bytes / self.total_bytes
+
+    def _fill(self):
+        """Baca chunk berikutnya; buang bagian buffer yang sudah diproses"""
+        if self._eof:
+            return False
+        raw = self._file.read(self.chunk_size)
+        self.read_bytes += len(raw)
+        if not raw:
+            self._eof = True
+        self._buf = self._buf[self._pos:] + self._decoder.decode(raw, final=not raw)
+        self._pos = 0
+        return bool(raw)
+
+    def peek(self):
+        """Karakter non-spasi berikutnya ('' jika file habis)"""
+        while True:
+            self._pos = WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON tidak valid: diharapkan '{char}' "
+                             f"pada byte ~{self.read_bytes}")
+        self._pos += 1
+
+    def value(self):
+        """Baca satu nilai JSON utuh pada posisi saat ini"""
+        self.peek()
+        while True:
+            try:
+                result, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Angka di ujung buffer bisa saja masih berlanjut di chunk berikutnya,
+            # termasuk "1." atau "1e" yang di-decode sebagai 1 sebelum titik/eksponen
+            if isinstance(result, (int, float)) and not isinstance(result, bool) \
+                    and not self._eof \
+                    and NUMBER_CHARS.match(self._buf, self._pos).end() == len(self._buf):
+                self._fill()
+                continue
+            self._pos = end
+            return result
+
+    def iter_array(self):
+        """Yield setiap elemen array satu per satu"""
+        self._expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self._expect(']')
+                return
+
+    def iter_object(self):
+        """Yield setiap key objek; pemanggil wajib membaca nilainya sebelum lanjut"""
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self._expect('}')
+                return
@@ -1,14 +1,26 @@
 # main_app.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
 import os
-from models import DataManager
-from ui_components import UIStyles
+from models import DataManager, DoublyLinkedList
+from columnar import ColumnarLibrary, parse_field_filters, matches_filters
+from search_engine import SearchIndex, matches
+from sort_index import SortIndex, sort_before, sort_spec
+from recommender import Recommender, SimilarityRecommender
+from sqlite_manager import SQLiteDataManager
+from background_writer import BackgroundWriter
+from image_cache import ThumbnailCache
+from prefetch import Prefetcher
+from playback import PlayHistory, PlayQueue
+from ui_components import UIStyles, SongListView, PlaylistSidebar
 from admin_controller import AdminController
 from user_controller import UserController
 from playlist_controller import PlaylistController
 
+# Kolom Treeview -> kolom sort (lihat sort_index.SORT_KEYS)
+SORT_COLUMNS = {'ID': 'id', 'Judul': 'title', 'Artis': 'artist', 'Genre': 'genre',
+                'Album': 'album', 'Tahun': 'year', 'Durasi': 'duration'}
+
 class MusicPlayerApp:
     def __init__(self, root):
         self.styles = UIStyles()
@@ -23,25 +35,72 @@ class MusicPlayerApp:
         self.admin_controller = AdminController(self)
         self.user_controller = UserController(self)
         self.playlist_controller = PlaylistController(self)
-        self.data_manager = DataManager()
-        
-        # Load data
-        self.library, self.playlists = self.data_manager.load_data()
+        # Pakai SQLite jika database hasil migrasi sudah ada (lihat sqlite_manager.py)
+        self.writer = BackgroundWriter()
+        if os.path.exists('music_data.db'):
+            self.data_manager = SQLiteDataManager(writer=self.writer)
+        else:
+            self.data_manager = DataManager(journal=True, binary_snapshot=True)
+        self.save_delay_ms = 500  # Jeda debounce sebelum snapshot ditulis
+        self._save_job = None
+        # Cover art (header & player bar) dimuat worker, lihat image_cache.py
+        self.thumbnails = ThumbnailCache(self.root, placeholder_color=self.colors['bg_sec'])
+        self.prefetcher = Prefetcher(self)  # Cover & rekomendasi lagu berikutnya
+        
+        # Load data bertahap: library sudah bisa tampil sebelum file selesai dibaca
+        self.loading = True
+        # Load gagal di tengah jalan: data di memori hanya sebagian, jangan pernah ditulis
+        self.load_failed = False
+        self._loader = self.data_manager.load_data_incremental()
+        self.library, self.playlists, _ = next(self._loader)
+        self.song_index = {}  # id -> record library
+        # Representasi kolom (NumPy) untuk filter/sort vektor; None tanpa NumPy
+        self.columns = ColumnarLibrary(self.library) if ColumnarLibrary.available() else None
+        # Inverted index untuk pencarian teks, diisi bertahap selama load
+        self.search_index = SearchIndex(self.song_index)
+        # Urutan sort yang dipelihara; sort hanya mengubah tampilan, bukan data
+        self.sort_index = SortIndex(self.song_index)
+        # Index rekomendasi next_song di mode library (lihat recommender.py)
+        self.recommender = Recommender(self.library, self.song_index)
+        # Rekomendasi berbasis skor kemiripan (butuh NumPy), dipakai jika similar_recommend aktif
+        self.similarity = SimilarityRecommender(self.columns) if self.columns else None
+        self.sort_order = None  # ((kolom, reverse), ...) atau None = urutan asli
+        self._heading_shift = False  # Shift ditekan saat klik heading terakhir
         
         # State
         self.role = 'user'
         self.current_song = None
-        self.played_history = []
-        self.play_queue = []
+        self.played_history = PlayHistory(capacity=50)  # Disimpan di play_history.log
+        self.played_history.load()
+        # Antrean berisi ID lagu, disimpan ke play_queue.json lewat writer
+        self.play_queue = PlayQueue(self.song_index, writer=self.writer)
+        self.play_queue.load()
         self.is_playing = False
         self.current_view = 'library'
         self.selected_playlist = None
         self.search_query = ""
+        self.search_delay_ms = 150  # Jeda debounce pencarian saat mengetik
+        self.search_chunk = 2000  # Jumlah lagu per langkah penyaringan bertahap
+        self.narrow_limit = 20000  # Hasil sebelumnya sebesar ini masih disaring langsung
+        self._search_job = None
+        self._search_generation = 0  # Naik setiap refresh; proses lama berhenti sendiri
+        self._search_cache = None  # (view, query, hasil) pencarian terakhir
+        self.fuzzy_search = False  # Toleran salah ketik, hasil urut relevansi
+        self.fuzzy_top_k = 50  # Jumlah hasil pencarian fuzzy
+        self.similar_recommend = False  # Next di library memakai skor kemiripan
+        self.recommend_blend = 3  # Jumlah lagu terakhir di riwayat yang jadi anchor
+        self.shuffle_mode = False
+        self.shuffle_seed = None  # None = seed acak setiap sesi; isi angka agar urutan bisa diulang
+        self.shuffle = None  # ShuffleOrder sesi shuffle yang sedang berjalan
+        self.shuffle_context = None  # ('library', None) atau ('playlist', nama) milik self.shuffle
         
         # Initialize UI components
         self.title_label = None
         self.tree = None
+        self.song_list = None  # SongListView: baris virtual di atas self.tree
+        self.showing_full_library = False  # List menampilkan seluruh library tanpa filter
         self.playlist_frame = None
+        self.playlist_sidebar = None  # PlaylistSidebar di dalam playlist_frame
         self.current_song_label = None
         self.play_btn = None
         self.status_label = None
@@ -62,14 +121,209 @@ class MusicPlayerApp:
         self.header_play_btn = None 
         self.header_icon = None # Keep ref for header image
         
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(200, self.poll_writer_errors)
+        self.root.after(1, self.load_step)
         self.show_role_selection()
     
+    # ==================== DATA LOADING ====================
+    def load_step(self):
+        """Proses satu batch data, tampilkan yang sudah siap, lalu lanjutkan"""
+        start = len(self.library)
+        playlist_count = len(self.playlists)
+        if self.shuffle is not None:
+            self.shuffle.detach()  # Replay journal bisa menggeser isi library
+        try:
+            _, _, progress = next(self._loader)
+        except StopIteration:
+            self.finish_loading()
+            return
+        except Exception as e:
+            self.load_failed = True
+            messagebox.showerror("Error", f"{e}\n\nData hanya termuat sebagian. "
+                                 "Perubahan tidak akan disimpan sampai aplikasi dibuka ulang.")
+            self.finish_loading()
+            return
+        
+        if getattr(self.data_manager, 'replayed_ops', None):
+            # Batch terakhir: replay journal bisa menghapus/mengurutkan ulang library
+            # sehingga posisi start tidak berlaku lagi; lagu baru dicari lewat ID
+            new_songs = [s for s in self.library if s['id'] not in self.song_index]
+        else:
+            new_songs = self.library[start:]
+        for song in new_songs:
+            self.song_index[song['id']] = song
+        self.search_index.add_many(new_songs)
+        self.sort_index.add_many(new_songs)
+        self.recommender.add_many(new_songs)
+        if self.shuffle_context == ('library', None):
+            for song in new_songs:
+                self.shuffle.add(song['id'])
+        if self.columns:
+            self.columns.invalidate(self.library)  # Dibangun saat dipakai, bukan per batch
+        self.library_changed()
+        self.root.title(f"Music Player - Memuat data {progress:.0%}")
+        
+        if self.ui_ready():
+            if self.showing_full_library:
+                self.song_list.extend(new_songs)
+            if len(self.playlists) != playlist_count:
+                self.playlist_controller.refresh_playlist_buttons()
+        
+        self.root.after(1, self.load_step)
+    
+    def finish_loading(self):
+        """Selesai load: bangun ulang index (journal bisa mengubah data) dan refresh UI"""
+        self.loading = False
+        self._loader = None
+        self.song_index = {s['id']: s for s in self.library}
+        self.search_index.songs_by_id = self.song_index
+        self.play_queue.songs_by_id = self.song_index
+        self.sort_index.invalidate(self.song_index)
+        self.recommender.songs_by_id = self.song_index
+        # Lagu yang diubah/dihapus oleh replay journal perlu di-index ulang
+        # (lagu yang ditambahkan replay sudah di-index di load_step)
+        for op in getattr(self.data_manager, 'replayed_ops', ()):
+            if op['op'] in ('song_update', 'song_delete'):
+                song_id = op['song']['id'] if op['op'] == 'song_update' else op['id']
+                song = self.song_index.get(song_id)
+                if song is None:
+                    self.search_index.remove(song_id)
+                    self.recommender.remove(song_id)
+                else:
+                    self.search_index.update(song)
+                    self.recommender.update(song)
+            elif op['op'] == 'library_order':
+                self.recommender.invalidate()
+        if self.columns:
+            self.columns.invalidate(self.library)
+        self.library_changed()
+        self.playlists.setdefault('My Favorites', DoublyLinkedList())
+        for playlist in self.playlists.values():
+            if not playlist.is_loaded:
+                playlist.songs_by_id = self.song_index  # Lepas dict milik loader
+        
+        # Snapshot biner basi/belum ada: buat ulang di background untuk startup berikutnya.
+        # Hanya setelah load lengkap; snapshot dari data parsial akan dianggap segar
+        if not self.load_failed and getattr(self.data_manager, 'snapshot_stale', False):
+            data = self.data_manager.build_snapshot(self.library, self.playlists)
+            self.writer.submit('binary_snapshot',
+                               lambda: self.data_manager.write_binary_snapshot(data))
+        self.root.title("Music Player - Aplikasi Pemutar Musik")
+        if self.ui_ready():
+            self.playlist_controller.refresh_playlist_buttons()
+            if self.current_view == 'playlist' and self.selected_playlist not in self.playlists:
+                self.show_library()
+            else:
+                self.refresh_song_list()
+    
+    def library_changed(self):
+        """Dipanggil setiap kali isi/urutan library berubah"""
+        self._search_cache = None
+        self.prefetcher.invalidate()
+    
+    def playlist_changed(self, name, added=None, removed=None):
+        """Dipanggil setiap kali isi playlist berubah (added/removed: ID lagu, jika ada)"""
+        if self.selected_playlist == name:
+            self._search_cache = None
+        if self.shuffle_context == ('playlist', name):
+            if added is not None:
+                self.shuffle.add(added)
+            if removed is not None:
+                self.shuffle.remove(removed)
+    
+    def song_added(self, song):
+        """Daftarkan lagu baru ke semua index"""
+        self.song_index[song['id']] = song
+        self.search_index.add(song)
+        self.sort_index.add(song)
+        self.recommender.add(song)
+        if self.columns:
+            self.columns.add(song)
+        if self.shuffle_context == ('library', None):
+            self.shuffle.add(song['id'])
+        self.library_changed()
+    
+    def song_updated(self, song, old_id=None):
+        """Perbarui index setelah record lagu diubah"""
+        if old_id is not None and old_id != song['id']:
+            self.song_index.pop(old_id, None)
+            self.search_index.remove(old_id)
+            self.song_index[song['id']] = song
+        self.search_index.update(song)
+        self.sort_index.update(song, old_id)
+        self.recommender.update(song, old_id)
+        if self.columns:
+            self.columns.update(song, old_id)
+        if self.shuffle is not None and old_id is not None and old_id != song['id']:
+            self.shuffle.remove(old_id)
+            self.shuffle.add(song['id'])
+        self.library_changed()
+    
+    def song_removed(self, song_id):
+        """Hapus lagu dari semua index"""
+        self.song_index.pop(song_id, None)
+        self.search_index.remove(song_id)
+        self.sort_index.remove(song_id)
+        self.recommender.remove(song_id)
+        if self.columns:
+            self.columns.remove(song_id)
+        if self.shuffle is not None:
+            self.shuffle.remove(song_id)  # Juga terhapus dari semua playlist
+        self.library_changed()
+    
+    def ui_ready(self):
+        """Cek apakah tampilan utama sedang aktif"""
+        return self.tree is not None and self.tree.winfo_exists()
+    
     # ==================== DATA MANAGEMENT ====================
-    def save_to_json(self):
+    def save_to_json(self, *ops):
+        """Simpan perubahan: tulis operasi ke journal, atau jadwalkan snapshot penuh"""
+        if self.load_failed:
+            return  # Menyimpan data parsial akan menimpa file yang gagal dimuat
         try:
-            self.data_manager.save_data(self.library, self.playlists)
+            if ops and self.data_manager.journal:
+                for op in ops:
+                    self.data_manager.append_op(op)
+                if not self.data_manager.needs_compaction():
+                    return
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+        
+        # Debounce: rentetan perubahan digabung jadi satu penulisan
+        if self._save_job is None:
+            self._save_job = self.root.after(self.save_delay_ms, self.flush_snapshot)
+    
+    def flush_snapshot(self):
+        """Ambil snapshot data lalu serahkan penulisannya ke thread background"""
+        self._save_job = None
+        if self.load_failed:
+            return
+        if self.loading:
+            # Data belum lengkap, jangan timpa file dengan snapshot parsial
+            self._save_job = self.root.after(self.save_delay_ms, self.flush_snapshot)
+            return
+        data = self.data_manager.build_snapshot(self.library, self.playlists)
+        self.writer.submit('snapshot', lambda: self.data_manager.write_snapshot(data))
+    
+    def poll_writer_errors(self):
+        """Tampilkan error dari thread penulis di thread UI"""
+        for e in self.writer.poll_errors():
+            messagebox.showerror("Error", str(e))
+        self.root.after(200, self.poll_writer_errors)
+    
+    def on_close(self):
+        """Pastikan semua data tertulis sebelum aplikasi ditutup"""
+        if self._save_job is not None:
+            self.root.after_cancel(self._save_job)
+            if not self.loading:
+                self.flush_snapshot()
+        self.writer.close()
+        self.thumbnails.close()
+        for e in self.writer.poll_errors():
+            messagebox.showerror("Error", str(e))
+        self.root.destroy()
     
     # ==================== UI SETUP ====================
     def setup_ui(self):
@@ -94,6 +348,12 @@ class MusicPlayerApp:
             padx=15, pady=8, relief='flat', cursor='hand2'
         ).pack(side='right', padx=10, pady=20)
 
+        tk.Button(header, text="📊 Statistik", font=('Arial', 10, 'bold'),
+            bg=self.colors['accent'], fg=self.colors['white'], 
+            command=self.user_controller.show_library_stats,
+            padx=15, pady=8, relief='flat', cursor='hand2'
+        ).pack(side='right', padx=10, pady=20)
+
         self.back_btn = tk.Button(header, text="⬅ Kembali", font=('Arial', 10, 'bold'),
                          bg=self.colors['accent'], fg=self.colors['white'], 
                          command=self.back_to_role_selection,
@@ -141,6 +401,12 @@ class MusicPlayerApp:
         
         self.playlist_frame = tk.Frame(sidebar, bg=self.colors['bg_sec'])
         self.playlist_frame.pack(fill='both', expand=True, padx=10)
+        # Logika: My Favorites hanya bisa diedit admin. Playlist lain bisa diedit user/admin.
+        self.playlist_sidebar = PlaylistSidebar(
+            self.playlist_frame, self.colors,
+            on_open=self.playlist_controller.show_playlist,
+            on_options=self.playlist_controller.show_playlist_options,
+            show_menu=lambda name: name != 'My Favorites' or self.role == 'admin')
         
         self.playlist_controller.refresh_playlist_buttons()
     
@@ -164,13 +430,20 @@ class MusicPlayerApp:
         search_entry.bind('<FocusIn>', lambda e: self.clear_placeholder(search_entry))
         search_entry.bind('<FocusOut>', lambda e: self.restore_placeholder(search_entry))
         
+        fuzzy_var = tk.BooleanVar(value=self.fuzzy_search)
+        tk.Checkbutton(search_frame, text="Fuzzy", variable=fuzzy_var,
+                      command=lambda: self.toggle_fuzzy(fuzzy_var.get()),
+                      bg=self.colors['bg_sec'], fg=self.colors['text'],
+                      selectcolor=self.colors['bg_main'],
+                      activebackground=self.colors['bg_sec']).pack(side='left', padx=5)
+        
         sort_frame = tk.Frame(search_frame, bg=self.colors['bg_sec'])
         sort_frame.pack(side='right', padx=5)
 
         tk.Label(sort_frame, text="Urutkan:", bg=self.colors['bg_sec'], 
                 fg=self.colors['text']).pack(side='left', padx=5)
 
-        sort_by = ttk.Combobox(sort_frame, values=['title', 'artist', 'year', 'id'], 
+        sort_by = ttk.Combobox(sort_frame, values=['asli', 'title', 'artist', 'year', 'id'], 
                             state='readonly', width=10)
         sort_by.set('title')
         sort_by.pack(side='left', padx=5)
@@ -185,6 +458,11 @@ class MusicPlayerApp:
                  bg=self.colors['accent'], fg=self.colors['white'], 
                  relief='flat', padx=10, pady=6).pack(side='left', padx=5)
 
+        tk.Button(sort_frame, text="💾 Terapkan Urutan", 
+                 command=self.apply_sort_order,
+                 bg=self.colors['accent_dark'], fg=self.colors['white'], 
+                 relief='flat', padx=10, pady=6).pack(side='left', padx=5)
+
         self.add_song_btn = tk.Button(search_frame, text="➕ Tambah Lagu", 
                                       font=('Arial', 10, 'bold'), 
                                       bg=self.colors['accent'], 
@@ -257,11 +535,12 @@ class MusicPlayerApp:
         self.tree.column('Durasi', width=80, anchor='center')
         
         for col in columns:
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_heading(c))
+        self.tree.bind('<Button-1>', lambda e: setattr(self, '_heading_shift', bool(e.state & 0x1)))
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical')
+        self.song_list = SongListView(self.tree, scrollbar)
         
         self.tree.pack(side='left', fill='both', expand=True, padx=(20, 0), pady=(0, 20))
         scrollbar.pack(side='right', fill='y', padx=(0, 20), pady=(0, 20))
@@ -275,6 +554,7 @@ class MusicPlayerApp:
         
         # Apply styles
         self.styles.configure_treeview_style()
+        self.update_sort_headings()
         self.refresh_song_list()
     
     def setup_player_controls(self):
@@ -319,6 +599,21 @@ class MusicPlayerApp:
                  command=self.user_controller.next_song, relief='flat', 
                  width=3, cursor='hand2').pack(side='left', padx=5)
         
+        shuffle_var = tk.BooleanVar(value=self.shuffle_mode)
+        tk.Checkbutton(controls, text="🔀", font=('Arial', 14), variable=shuffle_var,
+                      command=lambda: self.toggle_shuffle(shuffle_var.get()),
+                      bg=self.colors['bg_sec'], fg=self.colors['text'],
+                      selectcolor=self.colors['bg_main'],
+                      activebackground=self.colors['bg_sec']).pack(side='left', padx=5)
+        
+        if self.similarity:
+            similar_var = tk.BooleanVar(value=self.similar_recommend)
+            tk.Checkbutton(controls, text="Mirip", variable=similar_var,
+                          command=lambda: self.toggle_similar_recommend(similar_var.get()),
+                          bg=self.colors['bg_sec'], fg=self.colors['text'],
+                          selectcolor=self.colors['bg_main'],
+                          activebackground=self.colors['bg_sec']).pack(side='left', padx=5)
+        
         # Status
         self.status_label = tk.Label(player, text="⏸ Tidak diputar", font=('Arial', 10),
                                     bg=self.colors['bg_sec'], fg=self.colors['text_sec'])
@@ -334,8 +629,12 @@ class MusicPlayerApp:
                                    activeforeground=self.colors['white'])
         self.context_menu.add_command(label="▶ Play", 
                                      command=self.user_controller.play_selected_song)
+        self.context_menu.add_command(label="⏫ Putar Berikutnya", 
+                                     command=lambda: self.user_controller.add_to_queue(next_up=True))
         self.context_menu.add_command(label="➕ Tambah ke Antrean", 
                                      command=self.user_controller.add_to_queue)
+        self.context_menu.add_command(label="➕ Tambah Semua ke Antrean", 
+                                     command=self.user_controller.add_view_to_queue)
         self.context_menu.add_separator()
     
     def show_context_menu(self, event):
@@ -345,11 +644,11 @@ class MusicPlayerApp:
             self.tree.selection_set(item)
             
             # Clear existing menu items after separator
-            self.context_menu.delete(2, tk.END)
+            self.context_menu.delete(4, tk.END)
             
             # Ambil data lagu
             song_id = self.tree.item(item)['values'][0]
-            song = next((s for s in self.library if s['id'] == song_id), None)
+            song = self.song_index.get(song_id)
             
             if self.role == 'admin':
                 self.context_menu.add_command(label="✏ Edit", 
@@ -409,25 +708,47 @@ class MusicPlayerApp:
         self.header_type.config(text=type_text)
         self.header_desc.config(text=description)
         
-        # Image Logic
-        if image_path and os.path.exists(image_path):
-            try:
-                img = Image.open(image_path)
-                img = img.resize((150, 150), Image.Resampling.LANCZOS)
-                self.header_icon = ImageTk.PhotoImage(img)
-                self.header_img_label.config(image=self.header_icon, width=150, height=150)
-            except Exception as e:
-                print(f"Error header image: {e}")
-                self.header_img_label.config(image='', width=20, bg=self.colors['accent'])
+        # Image Logic: placeholder dulu, cover ditukar saat selesai dimuat
+        self.show_header_image(self.thumbnails.request('header', image_path, (150, 150),
+                                                       self.show_header_image))
+    
+    def show_header_image(self, image):
+        if not self.ui_ready():
+            return
+        self.header_icon = image
+        if image:
+            self.header_img_label.config(image=image, width=150, height=150)
         else:
              # Default generic icon or empty
              self.header_img_label.config(image='', width=20, bg=self.colors['accent_dark']) # Simple block color fallback
 
     
-    def refresh_song_list(self):
-        """Refresh daftar lagu pada TreeView"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def refresh_song_list(self, narrow=False):
+        """Refresh daftar lagu pada TreeView
+        
+        Dengan narrow=True (dipakai saat mengetik), query yang hanya
+        memperpanjang query sebelumnya cukup menyaring hasil sebelumnya.
+        Penyaringan besar dikerjakan bertahap lewat root.after dan
+        dibatalkan jika refresh baru dimulai; hanya baris yang terlihat yang
+        dibuat di Treeview (lihat SongListView).
+        """
+        self._search_generation += 1
+        generation = self._search_generation
+        
+        # Filter field (year:2000-2010, genre:pop, ...) lalu pencarian teks
+        filters, query = parse_field_filters(self.search_query)
+        query = query.lower()
+        view = (self.current_view, self.selected_playlist, filters, self.sort_order)
+        
+        fuzzy = self.fuzzy_search and query.strip()
+        
+        cache = self._search_cache
+        if narrow and not fuzzy and cache and cache[0] == view and cache[1] in query \
+                and len(cache[2]) <= self.narrow_limit:
+            # Hasil query baru pasti bagian dari hasil query sebelumnya
+            self.filter_in_chunks(generation, cache[2], query,
+                                  lambda songs: self.show_search_result(generation, view, query, songs))
+            return
         
         if self.current_view == 'library':
             songs = self.library
@@ -435,64 +756,181 @@ class MusicPlayerApp:
             playlist = self.playlists[self.selected_playlist]
             songs = playlist.to_list()
         
-        # Filter pencarian
-        query = self.search_query.lower()
-        if query:
-            songs = [
-                s for s in songs if 
-                query in s['title'].lower() or
-                query in s['artist'].lower() or
-                query in s['genre'].lower() or
-                query in s['album'].lower() or
-                query in str(s['id']) or
-                query in str(s['year'])
-            ]
-        
-        for song in songs:
-            icon = '⭐' if song.get('favorite', False) else '🎵'
-            self.tree.insert('', 'end', text=icon, values=(
-                song['id'], song['title'], song['artist'],
-                song['genre'], song['album'], song['year'], song['duration']
-            ))
+        if filters:
+            songs = self.filter_by_fields(songs, filters)
+        
+        if fuzzy:
+            # Hasil tetap urut relevansi (tidak mengikuti sort_order)
+            allowed = None if songs is self.library else {s['id'] for s in songs}
+            ids = self.search_index.fuzzy_search(query, self.fuzzy_top_k, allowed)
+            songs = [self.song_index[i] for i in ids]
+            self.show_search_result(generation, view, query, songs)
+            return
+        
+        # Pencarian teks lewat inverted index (lihat search_engine.py)
+        hits = self.search_index.search(query)
+        if hits is not None:
+            # Entri playlist format lama yang tidak ada di library dicek langsung
+            songs = [s for s in songs if s['id'] in hits or
+                     (s['id'] not in self.song_index and matches(s, query))]
+        
+        songs = self.apply_sort(songs)
+        self.show_search_result(generation, view, query, songs)
+    
+    def list_placement(self, song):
+        """Argumen SongListView.update_song untuk lagu yang baru diubah
+        
+        Lagu yang tidak lagi cocok dengan filter/pencarian dibuang dari
+        tampilan, dan dipindahkan ke posisinya yang baru jika list diurutkan.
+        """
+        filters, query = parse_field_filters(self.search_query)
+        query = query.lower()
+        if self.fuzzy_search and query.strip():
+            return {}  # Urut relevansi: cukup diperbarui di tempat
+        visible = matches_filters(song, filters) and (not query or matches(song, query))
+        before = sort_before(self.sort_order) if self.sort_order else None
+        return {'visible': visible, 'before': before}
+    
+    def filter_in_chunks(self, generation, songs, query, done, start=0, kept=None):
+        """Saring songs per potongan; berhenti jika ada refresh yang lebih baru"""
+        if generation != self._search_generation:
+            return
+        kept = [] if kept is None else kept
+        end = start + self.search_chunk
+        kept.extend(s for s in songs[start:end] if matches(s, query))
+        if end < len(songs):
+            self.root.after(1, self.filter_in_chunks, generation, songs, query, done, end, kept)
+        else:
+            done(kept)
+    
+    def show_search_result(self, generation, view, query, songs):
+        """Simpan hasil untuk penyaringan berikutnya lalu tampilkan"""
+        if generation != self._search_generation or not self.ui_ready():
+            return
+        self._search_cache = (view, query, songs)
+        self.showing_full_library = songs is self.library
+        self.song_list.set_songs(songs, unique=self.current_view == 'library')
+    
+    def filter_by_fields(self, songs, filters):
+        """Filter field secara vektor lewat ColumnarLibrary (fallback: loop Python)"""
+        if not self.columns:
+            return [s for s in songs if matches_filters(s, filters)]
+        
+        mask = self.columns.filter_mask(filters)
+        if songs is self.library:
+            return self.columns.take(mask)
+        allowed = set(self.columns.ids[mask].tolist())
+        return [s for s in songs if s['id'] in allowed]
     
     def sort_songs(self, by='title', order='asc'):
-        """Mengurutkan lagu berdasarkan kriteria"""
-        if self.current_view == 'library':
-            songs = self.library
+        """Tampilkan lagu dalam urutan tertentu tanpa mengubah data"""
+        self.sort_order = None if by == 'asli' else ((by, order == 'desc'),)
+        self.update_sort_headings()
+        self.refresh_song_list()
+    
+    def sort_by_heading(self, column):
+        """Klik heading: urutkan per kolom (klik lagi = balik arah)
+        
+        Shift+klik menambahkan kolom sebagai urutan berikutnya, mis. Artis
+        lalu Tahun lalu Judul.
+        """
+        by = SORT_COLUMNS[column]
+        order = list(self.sort_order or ())
+        columns = [c for c, _ in order]
+        if self._heading_shift and by in columns:
+            i = columns.index(by)
+            order[i] = (by, not order[i][1])
+        elif self._heading_shift:
+            order.append((by, False))
+        elif columns[:1] == [by] and len(order) == 1:
+            order = [(by, not order[0][1])]
         else:
-            songs = self.playlists[self.selected_playlist].to_list()
-        
-        reverse = (order == 'desc')
-        
-        if by == 'title':
-            songs.sort(key=lambda s: s['title'].lower(), reverse=reverse)
-        elif by == 'artist':
-            songs.sort(key=lambda s: s['artist'].lower(), reverse=reverse)
-        elif by == 'year':
-            songs.sort(key=lambda s: s['year'], reverse=reverse)
-        elif by == 'id':
-            songs.sort(key=lambda s: s['id'], reverse=reverse)
+            order = [(by, False)]
+        self.sort_order = tuple(order)
+        self.update_sort_headings()
+        self.refresh_song_list()
+    
+    def update_sort_headings(self):
+        """Tampilkan arah urutan (▲/▼, beserta nomor jika multi-kolom) di heading"""
+        order = self.sort_order or ()
+        for column, by in SORT_COLUMNS.items():
+            text = column
+            for i, (c, reverse) in enumerate(order):
+                if c == by:
+                    text += ' ▼' if reverse else ' ▲'
+                    if len(order) > 1:
+                        text += str(i + 1)
+            self.tree.heading(column, text=text)
+    
+    def apply_sort(self, songs):
+        """Urutkan hasil sesuai sort_order (lihat SortIndex)"""
+        if not self.sort_order:
+            return songs
+        if songs is self.library and len(self.sort_order) == 1:
+            return self.sort_index.ordered(*self.sort_order[0])
+        return self.sort_index.sort(songs, self.sort_order)
+    
+    def apply_sort_order(self):
+        """Simpan urutan tampilan sebagai urutan asli playlist/library"""
+        if not self.sort_order:
+            messagebox.showinfo("Info", "Pilih urutan terlebih dahulu!")
+            return
         
-        # Update data
         if self.current_view == 'library':
-            self.library = songs
+            if self.shuffle is not None:
+                self.shuffle.detach()
+            self.library[:] = self.apply_sort(self.library)
+            self.recommender.invalidate()  # Urutan library ikut menentukan rekomendasi
+            if self.columns:
+                self.columns.invalidate(self.library)
+            self.library_changed()
+            op = {'op': 'library_order', 'ids': [s['id'] for s in self.library]}
         else:
-            # Rebuild playlist dengan urutan baru
-            from models import DoublyLinkedList
-            playlist = DoublyLinkedList()
-            playlist.image_path = self.playlists[self.selected_playlist].image_path
-            for song in songs:
-                playlist.append(song)
-            self.playlists[self.selected_playlist] = playlist
-        
-        self.save_to_json()
-        self.refresh_song_list()
+            # Node playlist disusun ulang di tempat (description, dst. tetap)
+            playlist = self.playlists[self.selected_playlist]
+            playlist.sort(key=sort_spec(self.sort_order))
+            self.playlist_changed(self.selected_playlist)
+            op = {'op': 'playlist_order', 'name': self.selected_playlist,
+                  'ids': [s['id'] for s in playlist.to_list()]}
+        
+        self.save_to_json(op)
+        self.sort_order = None  # Urutan asli sekarang sudah sama dengan tampilan
+        self.update_sort_headings()
+        messagebox.showinfo("Sukses", "Urutan berhasil disimpan!")
     
     # ==================== SEARCH ====================
     def search_songs(self, text):
+        """Jadwalkan pencarian; ketikan beruntun digabung menjadi satu pencarian"""
+        if text == self.search_query:
+            return  # Tombol tanpa perubahan teks (panah, shift, ...)
         self.search_query = text
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(self.search_delay_ms, self.run_search)
+    
+    def run_search(self):
+        self._search_job = None
+        if self.ui_ready():
+            self.refresh_song_list(narrow=True)
+    
+    def toggle_fuzzy(self, enabled):
+        """Aktifkan/matikan pencarian toleran salah ketik (lihat SearchIndex.fuzzy_search)"""
+        self.fuzzy_search = enabled
+        if enabled:
+            self.search_index.prepare_fuzzy()
         self.refresh_song_list()
     
+    def toggle_similar_recommend(self, enabled):
+        """Pilih rekomendasi next_song: skor kemiripan (SimilarityRecommender) atau prioritas"""
+        self.similar_recommend = enabled
+        self.prefetcher.invalidate()
+    
+    def toggle_shuffle(self, enabled):
+        """Aktifkan/matikan mode acak; sesi baru dimulai saat Next berikutnya"""
+        self.shuffle_mode = enabled
+        self.shuffle = None
+        self.shuffle_context = None
+    
     def clear_placeholder(self, entry):
         if entry.get().startswith("🔍"):
             entry.delete(0, tk.END)
@@ -614,8 +1052,19 @@ class MusicPlayerApp:
                 width=15).pack(side='left', padx=20)
     
     # ==================== PLAYER UI ====================
+    def show_player_image(self, image):
+        if not self.ui_ready():
+            return
+        self.current_image = image
+        if image:
+            self.current_image_label.config(image=image, width=60, height=60)
+        else:
+            # Clear image if no path or file not found
+            self.current_image_label.config(image='', width=0)
+    
     def update_player_ui(self):
         """Update tampilan player di bagian bawah"""
+        self.prefetcher.song_started(self.current_song)
         if not self.current_song:
             self.current_song_label.config(text="Tidak ada lagu diputar")
             self.status_label.config(text="⏸ Tidak diputar")
@@ -623,8 +1072,8 @@ class MusicPlayerApp:
                                fg=self.colors['white'])
             
             # Clear image
-            self.current_image_label.configure(image='', width=0)
-            self.current_image = None
+            self.thumbnails.cancel('player')
+            self.show_player_image(None)
             return
         
         # Update text
@@ -632,23 +1081,9 @@ class MusicPlayerApp:
             text=f"🎵 {self.current_song['title']}\n👤 {self.current_song['artist']}"
         )
         
-        # Update Image
-        try:
-            image_path = self.current_song.get('image_path')
-            if image_path and os.path.exists(image_path):
-                # Load and Resize
-                img = Image.open(image_path)
-                img = img.resize((60, 60), Image.Resampling.LANCZOS)
-                self.current_image = ImageTk.PhotoImage(img)
-                self.current_image_label.config(image=self.current_image, width=60, height=60)
-            else:
-                # Clear image if no path or file not found
-                self.current_image_label.config(image='', width=0)
-                self.current_image = None
-        except Exception as e:
-            print(f"Error updating player image: {e}")
-            self.current_image_label.config(image='', width=0)
-            self.current_image = None
+        # Update Image: placeholder dulu, cover ditukar saat selesai dimuat
+        self.show_player_image(self.thumbnails.request('player', self.current_song.get('image_path'),
+                                                       (60, 60), self.show_player_image))
         
         if self.is_playing:
             self.status_label.config(text="▶ Memutar")
@@ -1,22 +1,33 @@
 # models.py
 from typing import Optional
 import json
+import os
+import tempfile
+import threading
+from collections import Counter
+from json_stream import JsonStream
+import binary_snapshot
 
 class SongNode:
-    """Node untuk Doubly Linked List"""
+    """Node untuk Doubly Linked List (data = record lagu bersama dari library)"""
     def __init__(self, song_data):
+        self.song_id = song_data['id']
         self.data = song_data
         self.next: Optional[SongNode] = None
         self.prev: Optional[SongNode] = None
 
 class DoublyLinkedList:
     """Doubly Linked List untuk Playlist"""
+    is_loaded = True  # Node sudah dibangun (lihat LazyPlaylist)
+    
     def __init__(self):
         self.head: Optional[SongNode] = None
         self.tail: Optional[SongNode] = None
         self.size = 0
         self.image_path = None
         self.description = ""
+        # Index id -> daftar node (urut dari depan), satu id bisa muncul berkali-kali
+        self._index = {}
     
     def append(self, song_data):
         """Menambah lagu di akhir playlist"""
@@ -28,27 +39,39 @@ class DoublyLinkedList:
             self.tail.next = new_node
             new_node.prev = self.tail
             self.tail = new_node
+        self._index.setdefault(new_node.song_id, []).append(new_node)
         self.size += 1
     
     def remove(self, song_id):
-        """Menghapus lagu berdasarkan ID"""
-        current = self.head
-        while current:
-            if current.data['id'] == song_id:
-                if current.prev:
-                    current.prev.next = current.next
-                else:
-                    self.head = current.next
-                
-                if current.next:
-                    current.next.prev = current.prev
-                else:
-                    self.tail = current.prev
-                
-                self.size -= 1
-                return True
-            current = current.next
-        return False
+        """Menghapus lagu berdasarkan ID (kemunculan pertama)"""
+        nodes = self._index.get(song_id)
+        if not nodes:
+            return False
+        
+        current = nodes.pop(0)
+        if not nodes:
+            del self._index[song_id]
+        
+        if current.prev:
+            current.prev.next = current.next
+        else:
+            self.head = current.next
+        
+        if current.next:
+            current.next.prev = current.prev
+        else:
+            self.tail = current.prev
+        
+        current.prev = current.next = None
+        self.size -= 1
+        return True
+    
+    def remove_all(self, song_id):
+        """Menghapus semua kemunculan lagu dengan ID tertentu"""
+        removed = 0
+        while self.remove(song_id):
+            removed += 1
+        return removed
     
     def to_list(self):
         """Konversi linked list ke Python list"""
@@ -61,70 +84,543 @@ class DoublyLinkedList:
     
     def find_node(self, song_id):
         """Mencari node berdasarkan song_id"""
-        current = self.head
-        while current:
-            if current.data['id'] == song_id:
-                return current
-            current = current.next
-        return None
+        nodes = self._index.get(song_id)
+        return nodes[0] if nodes else None
+    
+    def count(self, song_id):
+        """Jumlah kemunculan song_id di playlist"""
+        return len(self._index.get(song_id, ()))
+    
+    def __contains__(self, song_id):
+        return song_id in self._index
+    
+    def sort(self, key=None, reverse=False, stable=True):
+        """Urutkan playlist di tempat (merge sort bottom-up), tanpa node baru
+        
+        key(record) dihitung sekali per node; default mengurutkan menurut ID.
+        Untuk urutan multi-kolom, key boleh berupa list (key, reverse) dari
+        kolom utama ke kolom terakhir, mis. [(by_artist, False),
+        (by_year, True), (by_title, False)]. Dengan stable=False urutan lagu
+        yang key-nya sama boleh berubah (reverse cukup membalik hasil).
+        """
+        if isinstance(key, (list, tuple)):
+            # Sort stabil dari kolom terakhir ke kolom utama
+            for spec in reversed(key):
+                k, rev = spec if isinstance(spec, tuple) else (spec, reverse)
+                self._merge_sort(k, rev)
+        elif reverse and not stable:
+            self._merge_sort(key, False)
+            self._reverse_links()
+        else:
+            self._merge_sort(key, reverse)
+        
+        # Sambung ulang prev/tail dan index sesuai urutan baru
+        self._index = {}
+        prev = None
+        node = self.head
+        while node:
+            node.prev = prev
+            self._index.setdefault(node.song_id, []).append(node)
+            prev = node
+            node = node.next
+        self.tail = prev
+    
+    def _merge_sort(self, key, reverse):
+        head = self.head
+        if head is None or head.next is None:
+            return
+        node = head
+        while node:
+            node.sort_key = key(node.data) if key else node.song_id
+            node = node.next
+        
+        width = 1
+        while True:
+            new_head = last = None
+            merges = 0
+            left = head
+            while left:
+                right = self._split(left, width)
+                rest = self._split(right, width)
+                first, end = self._merge(left, right, reverse)
+                if last:
+                    last.next = first
+                else:
+                    new_head = first
+                last = end
+                left = rest
+                merges += 1
+            head = new_head
+            if merges <= 1:
+                break
+            width *= 2
+        self.head = head
+        
+        node = head
+        while node:
+            del node.sort_key
+            node = node.next
+    
+    @staticmethod
+    def _split(node, width):
+        """Putus list setelah width node; kembalikan sisa list"""
+        for _ in range(width - 1):
+            if node is None:
+                return None
+            node = node.next
+        if node is None:
+            return None
+        rest = node.next
+        node.next = None
+        return rest
+    
+    @staticmethod
+    def _merge(left, right, reverse):
+        """Gabungkan dua run terurut (stabil); kembalikan (awal, akhir)"""
+        dummy = end = SongNode.__new__(SongNode)
+        while left and right:
+            # Ambil dari kiri kecuali kanan benar-benar lebih dulu (stabil)
+            if (left.sort_key < right.sort_key) if reverse else \
+                    (right.sort_key < left.sort_key):
+                end.next = right
+                right = right.next
+            else:
+                end.next = left
+                left = left.next
+            end = end.next
+        end.next = left or right
+        while end.next:
+            end = end.next
+        return dummy.next, end
+    
+    def _reverse_links(self):
+        prev = None
+        node = self.head
+        while node:
+            node.next, prev, node = prev, node, node.next
+        self.head = prev
+
+def atomic_write(path, content):
+    """Tulis file lewat file sementara + fsync + os.replace (tidak pernah setengah jadi)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+    try:
+        if isinstance(content, (bytes, bytearray)):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        with f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def apply_op(library, playlists, songs_by_id, op):
+    """Terapkan satu operasi journal ke data di memori"""
+    kind = op['op']
+    
+    if kind == 'song_add':
+        song = op['song']
+        library.append(song)
+        songs_by_id[song['id']] = song
+    elif kind == 'song_update':
+        song = songs_by_id.get(op['song']['id'])
+        if song is not None:
+            song.update(op['song'])
+    elif kind == 'song_delete':
+        song_id = op['id']
+        if songs_by_id.pop(song_id, None) is not None:
+            library[:] = [s for s in library if s['id'] != song_id]
+        for playlist in playlists.values():
+            playlist.remove_all(song_id)
+    elif kind == 'library_order':
+        ordered = [songs_by_id[i] for i in op['ids'] if i in songs_by_id]
+        listed = set(op['ids'])
+        library[:] = ordered + [s for s in library if s['id'] not in listed]
+    elif kind == 'playlist_create':
+        playlist = DoublyLinkedList()
+        playlist.image_path = op.get('image_path')
+        playlist.description = op.get('description', "")
+        playlists[op['name']] = playlist
+    elif kind == 'playlist_update':
+        name = op['name']
+        new_name = op.get('new_name', name)
+        if name != new_name:
+            playlists[new_name] = playlists.pop(name)
+        playlist = playlists[new_name]
+        playlist.image_path = op.get('image_path', playlist.image_path)
+        playlist.description = op.get('description', playlist.description)
+    elif kind == 'playlist_delete':
+        playlists.pop(op['name'], None)
+    elif kind in ('playlist_add', 'playlist_remove', 'playlist_order') \
+            and op['name'] not in playlists:
+        return  # Playlist sudah dihapus
+    elif kind == 'playlist_add':
+        song = songs_by_id.get(op['id'])
+        if song is not None:
+            playlists[op['name']].append(song)
+    elif kind == 'playlist_remove':
+        playlists[op['name']].remove(op['id'])
+    elif kind == 'playlist_order':
+        old = playlists[op['name']]
+        playlist = DoublyLinkedList()
+        playlist.image_path = old.image_path
+        playlist.description = old.description
+        for song_id in op['ids']:
+            song = songs_by_id.get(song_id)
+            if song is not None:
+                playlist.append(song)
+        playlists[op['name']] = playlist
+    else:
+        raise ValueError(f"Operasi journal tidak dikenal: {kind}")
+
+def entry_id(entry):
+    """ID lagu dari entri playlist mentah (ID atau dict format lama)"""
+    return entry.get('id') if isinstance(entry, dict) else entry
+
+class LazyPlaylist(DoublyLinkedList):
+    """Playlist yang node-nya baru dibangun saat pertama kali dibutuhkan
+    
+    Sebelum itu hanya menyimpan entri mentah (ID lagu atau dict format lama),
+    jadi nama, image_path, description dan size bisa dipakai tanpa membangun
+    node. Playlist yang belum dimuat disimpan kembali apa adanya. Jumlah
+    kemunculan setiap ID di entri mentah dicatat, sehingga `in`/count() dan
+    menghapus lagu yang tidak ada di playlist tetap O(1) tanpa memuatnya.
+    """
+    def __init__(self, songs_by_id, entries=()):
+        self._loaded = False
+        super().__init__()
+        self.songs_by_id = songs_by_id
+        self._entries = list(entries)
+        self._counts = Counter(entry_id(entry) for entry in self._entries)
+        self.size = len(self._entries)
+    
+    @property
+    def is_loaded(self):
+        return self._loaded
+    
+    @property
+    def head(self):
+        self.materialize()
+        return self._head
+    
+    @head.setter
+    def head(self, node):
+        self._head = node
+    
+    @property
+    def tail(self):
+        self.materialize()
+        return self._tail
+    
+    @tail.setter
+    def tail(self, node):
+        self._tail = node
+    
+    def materialize(self):
+        """Bangun node dari entri mentah (hanya sekali)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        entries, self._entries = self._entries, None
+        self._counts = None
+        self.size = 0
+        for entry in entries:
+            song = DataManager.resolve_entry(entry, self.songs_by_id)
+            if song:
+                self.append(song)
+    
+    def add_entry(self, entry):
+        """Tambah entri mentah tanpa membangun node (dipakai loader)"""
+        if self._loaded:
+            song = DataManager.resolve_entry(entry, self.songs_by_id)
+            if song:
+                self.append(song)
+        else:
+            self._entries.append(entry)
+            self._counts[entry_id(entry)] += 1
+            self.size += 1
+    
+    def raw_entries(self):
+        """Entri mentah, tanpa disalin (jangan diubah)
+        
+        Menghapus entri membuat list baru, jadi list yang sudah diambil
+        (mis. oleh ShuffleOrder) tidak pernah bergeser; entri baru hanya
+        ditambahkan di akhir.
+        """
+        return self._entries
+    
+    def remove(self, song_id):
+        if self._loaded:
+            return super().remove(song_id)
+        if song_id not in self._counts:
+            return False
+        for i, entry in enumerate(self._entries):
+            if entry_id(entry) == song_id:
+                self._entries = self._entries[:i] + self._entries[i + 1:]
+                self._discount(song_id, 1)
+                return True
+        return False
+    
+    def remove_all(self, song_id):
+        if self._loaded:
+            return super().remove_all(song_id)
+        removed = self._counts.get(song_id, 0)
+        if removed:
+            # Satu kali saring, bukan remove() berulang
+            self._entries = [entry for entry in self._entries if entry_id(entry) != song_id]
+            self._discount(song_id, removed)
+        return removed
+    
+    def _discount(self, song_id, removed):
+        self._counts[song_id] -= removed
+        if not self._counts[song_id]:
+            del self._counts[song_id]
+        self.size -= removed
+    
+    def find_node(self, song_id):
+        self.materialize()
+        return super().find_node(song_id)
+    
+    def count(self, song_id):
+        if self._loaded:
+            return super().count(song_id)
+        return self._counts.get(song_id, 0)
+    
+    def __contains__(self, song_id):
+        if self._loaded:
+            return super().__contains__(song_id)
+        return song_id in self._counts
 
 class DataManager:
-    """Manager untuk handle penyimpanan dan pembacaan data"""
-    def __init__(self, file_path='music_data.json'):
+    """Manager untuk handle penyimpanan dan pembacaan data
+    
+    Dalam mode journal, setiap perubahan ditambahkan sebagai satu baris operasi
+    ke file journal (append-only). Snapshot JSON hanya ditulis ulang saat
+    journal melewati compact_threshold (byte).
+    
+    Jika binary_snapshot aktif, salinan biner (lihat binary_snapshot.py)
+    ditulis di samping JSON dan dipakai saat load selama masih sesuai
+    dengan file JSON-nya.
+    """
+    def __init__(self, file_path='music_data.json', journal=False,
+                 compact_threshold=256 * 1024, binary_snapshot=False):
         self.file_path = file_path
+        self.journal = journal
+        self.journal_path = file_path + '.journal'
+        self.binary_snapshot = binary_snapshot
+        self.snapshot_path = os.path.splitext(file_path)[0] + '.snap'
+        self.snapshot_stale = False  # True jika load terakhir tidak memakai snapshot biner
+        self.compact_threshold = compact_threshold
+        self.journal_seq = 0  # Nomor urut operasi terakhir
+        self.replayed_ops = []  # Operasi journal yang diterapkan saat load terakhir
+        self._journal_lock = threading.Lock()
     
-    def save_data(self, library, playlists):
-        """Simpan data ke JSON"""
-        try:
-            data = {
-                'library': library,
-                'playlists': {}
+    def build_snapshot(self, library, playlists):
+        """Salin data ke bentuk siap-simpan (dipanggil di thread UI)"""
+        # journal_seq ditulis paling awal agar terbaca duluan oleh loader streaming
+        data = {
+            'journal_seq': self.journal_seq,
+            'library': [dict(s) for s in library],
+            'playlists': {}
+        }
+        
+        # Playlist disimpan sebagai daftar ID; lagu yang tidak ada di library
+        # tetap disimpan utuh supaya datanya tidak hilang
+        library_ids = {s['id'] for s in library}
+        for name, playlist in playlists.items():
+            # Playlist yang belum dimuat ditulis balik tanpa membangun node
+            entries = playlist.to_list() if playlist.is_loaded else playlist.raw_entries()
+            data['playlists'][name] = {
+                'image_path': playlist.image_path,
+                'description': playlist.description,
+                'songs': [entry_id(e) if entry_id(e) in library_ids or not isinstance(e, dict)
+                          else dict(e) for e in entries]
             }
-            
-            for name, playlist in playlists.items():
-                data['playlists'][name] = {
-                    'image_path': playlist.image_path,
-                    'description': playlist.description,
-                    'songs': playlist.to_list()
-                }
-            
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+        return data
+    
+    def write_snapshot(self, data):
+        """Tulis snapshot secara atomik lalu buang operasi journal yang sudah masuk"""
+        try:
+            atomic_write(self.file_path,
+                         json.dumps(data, indent=4, ensure_ascii=False))
+            if self.binary_snapshot:
+                self.write_binary_snapshot(data)
+            if self.journal:
+                self.compact_journal(data['journal_seq'])
             return True
         except Exception as e:
             raise Exception(f"Gagal menyimpan data: {e}")
     
+    def write_binary_snapshot(self, data):
+        """Tulis snapshot biner yang mencerminkan data + file JSON saat ini"""
+        if not binary_snapshot.can_write(data) or not os.path.exists(self.file_path):
+            return False
+        atomic_write(self.snapshot_path,
+                     binary_snapshot.pack_snapshot(data, self.file_path))
+        self.snapshot_stale = False
+        return True
+    
+    def save_data(self, library, playlists):
+        """Simpan data ke JSON (snapshot penuh, sekaligus compact journal)"""
+        return self.write_snapshot(self.build_snapshot(library, playlists))
+    
+    def append_op(self, op):
+        """Tambahkan satu operasi ke journal"""
+        try:
+            with self._journal_lock:
+                self.journal_seq += 1
+                record = dict(op, seq=self.journal_seq)
+                with open(self.journal_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except Exception as e:
+            raise Exception(f"Gagal menyimpan data: {e}")
+    
+    def compact_journal(self, upto_seq):
+        """Hapus operasi dengan seq <= upto_seq dari journal"""
+        with self._journal_lock:
+            remaining = [json.dumps(op, ensure_ascii=False) + '\n'
+                         for op in self.read_journal() if op['seq'] > upto_seq]
+            if remaining or os.path.exists(self.journal_path):
+                atomic_write(self.journal_path, ''.join(remaining))
+    
+    def needs_compaction(self):
+        """Cek apakah journal sudah melewati batas ukuran"""
+        try:
+            return os.path.getsize(self.journal_path) > self.compact_threshold
+        except OSError:
+            return False
+    
+    def read_journal(self):
+        """Baca operasi dari journal (baris terakhir yang terpotong diabaikan)"""
+        ops = []
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        ops.append(json.loads(line))
+                    except ValueError:
+                        # Baris rusak (misal aplikasi mati saat menulis)
+                        break
+        except FileNotFoundError:
+            pass
+        return ops
+    
+    @staticmethod
+    def resolve_entry(entry, songs_by_id):
+        """Ubah entri playlist (ID atau dict format lama) menjadi record library"""
+        if isinstance(entry, dict):
+            return songs_by_id.get(entry.get('id'), entry)
+        return songs_by_id.get(entry)
+    
     def load_data(self):
-        """Load data dari JSON"""
+        """Load data dari JSON (ditambah replay journal jika mode journal aktif)"""
+        for library, playlists, _ in self.load_data_incremental():
+            pass
+        return library, playlists
+    
+    def load_data_incremental(self, batch_size=1000):
+        """Load data bertahap tanpa mem-parse seluruh file sekaligus
+        
+        Generator ini yield (library, playlists, progress) setelah setiap
+        batch_size entri. library dan playlists adalah objek yang sama di
+        setiap yield dan terus bertambah; progress bernilai 0.0 - 1.0.
+        """
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            library = data.get('library', [])
+            ops = self.read_journal() if self.journal else []
+            # Tentukan seq terakhir sedini mungkin supaya operasi baru selama
+            # proses load mendapat nomor yang lebih besar
+            self.journal_seq = max((op['seq'] for op in ops), default=0)
+            snapshot_seq = 0
             
+            library = []
             playlists = {}
-            playlists_data = data.get('playlists', {})
-            for name, content in playlists_data.items():
-                dll = DoublyLinkedList()
-                
-                # Check format compatibility (list of songs vs dict with metadata)
-                if isinstance(content, list):
-                    songs = content
-                    image_path = None
-                    description = ""
-                else:
-                    songs = content.get('songs', [])
-                    image_path = content.get('image_path')
-                    description = content.get('description', "")
-                
-                dll.image_path = image_path
-                dll.description = description
-                for song in songs:
-                    dll.append(song)
-                playlists[name] = dll
-                
-            return library, playlists
-        except FileNotFoundError:
-            return [], {'My Favorites': DoublyLinkedList()}
+            songs_by_id = {}
+            yield library, playlists, 0.0
+            
+            snapshot = None
+            if self.binary_snapshot:
+                snapshot = binary_snapshot.BinarySnapshot.open_if_fresh(
+                    self.snapshot_path, self.file_path)
+                self.snapshot_stale = snapshot is None
+            
+            if snapshot:
+                try:
+                    snapshot_seq = snapshot.journal_seq
+                    self.journal_seq = max(self.journal_seq, snapshot_seq)
+                    for i, song in enumerate(snapshot.iter_songs()):
+                        library.append(song)
+                        songs_by_id[song['id']] = song
+                        if (i + 1) % batch_size == 0:
+                            yield library, playlists, 0.9 * (i + 1) / snapshot.song_count
+                    for name, image_path, description, indexes in snapshot.iter_playlists():
+                        playlist = LazyPlaylist(songs_by_id, (library[i]['id'] for i in indexes))
+                        playlist.image_path = image_path
+                        playlist.description = description
+                        playlists[name] = playlist
+                finally:
+                    snapshot.close()
+            elif not os.path.exists(self.file_path):
+                playlists['My Favorites'] = DoublyLinkedList()
+            else:
+                with JsonStream(self.file_path) as stream:
+                    pending = 0
+                    for key in stream.iter_object():
+                        if key == 'journal_seq':
+                            snapshot_seq = stream.value()
+                            self.journal_seq = max(self.journal_seq, snapshot_seq)
+                        elif key == 'library':
+                            for song in stream.iter_array():
+                                library.append(song)
+                                songs_by_id[song['id']] = song
+                                pending += 1
+                                if pending >= batch_size:
+                                    pending = 0
+                                    yield library, playlists, stream.progress()
+                        elif key == 'playlists':
+                            for name in stream.iter_object():
+                                playlist = LazyPlaylist(songs_by_id)
+                                playlists[name] = playlist
+                                for entry in self._iter_playlist_entries(stream, playlist):
+                                    playlist.add_entry(entry)
+                                    pending += 1
+                                    if pending >= batch_size:
+                                        pending = 0
+                                        yield library, playlists, stream.progress()
+                        else:
+                            stream.value()
+            
+            self.replayed_ops = [op for op in ops if op['seq'] > snapshot_seq]
+            for op in self.replayed_ops:
+                apply_op(library, playlists, songs_by_id, op)
+            
+            yield library, playlists, 1.0
         except Exception as e:
-            raise Exception(f"Gagal memuat data: {e}")
\ No newline at end of file
+            raise Exception(f"Gagal memuat data: {e}")
+    
+    @staticmethod
+    def _iter_playlist_entries(stream, playlist):
+        """Yield entri lagu playlist sambil mengisi metadata ke playlist"""
+        # Check format compatibility (list of songs vs dict with metadata)
+        if stream.peek() == '[':
+            yield from stream.iter_array()
+            return
+        
+        for key in stream.iter_object():
+            if key == 'songs':
+                yield from stream.iter_array()
+            elif key == 'image_path':
+                playlist.image_path = stream.value()
+            elif key == 'description':
+                playlist.description = stream.value() or ""
+            else:
+                stream.value()
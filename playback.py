@@ -0,0 +1,369 @@
+import json
+import random
+from itertools import islice
+from collections import Counter, deque
+from models import atomic_write, entry_id
+
+
+class PlayHistory:
+    """Riwayat lagu yang diputar: ring buffer berkapasitas tetap
+
+    Lagu tertua otomatis terbuang saat buffer penuh. Counter pendamping
+    mencatat berapa kali setiap ID ada di buffer, sehingga `song_id in
+    history` O(1). Setiap push/pop ditambahkan sebagai satu baris ke file
+    log (append-only) dan diputar ulang saat load; log ditulis ulang
+    menjadi isi buffer saja setelah melewati compact_after baris.
+    """
+    def __init__(self, capacity=50, path='play_history.log', compact_after=None):
+        self.capacity = capacity
+        self.path = path
+        self.compact_after = compact_after or capacity * 4
+        self.version = 0  # Naik setiap isi berubah (untuk cache di luar kelas ini)
+        self._items = deque(maxlen=capacity)
+        self._counts = Counter()
+        self._log_lines = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        """ID lagu dari yang paling lama ke yang terbaru"""
+        return iter(self._items)
+
+    def __reversed__(self):
+        return reversed(self._items)
+
+    def __contains__(self, song_id):
+        return song_id in self._counts
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    # ==================== PERUBAHAN ====================
+    def push(self, song_id):
+        """Catat lagu yang mulai diputar (duplikat berurutan diabaikan)"""
+        if self._items and self._items[-1] == song_id:
+            return False
+        self._push(song_id)
+        self._log({'op': 'push', 'id': song_id})
+        return True
+
+    def pop(self):
+        """Buang dan kembalikan lagu terbaru (untuk tombol Previous)"""
+        song_id = self._pop()
+        self._log({'op': 'pop'})
+        return song_id
+
+    def _push(self, song_id):
+        if len(self._items) == self.capacity:
+            self._discount(self._items[0])
+        self._items.append(song_id)
+        self._counts[song_id] += 1
+        self.version += 1
+
+    def _pop(self):
+        song_id = self._items.pop()
+        self._discount(song_id)
+        self.version += 1
+        return song_id
+
+    def _discount(self, song_id):
+        self._counts[song_id] -= 1
+        if not self._counts[song_id]:
+            del self._counts[song_id]
+
+    # ==================== PENYIMPANAN ====================
+    def load(self):
+        """Putar ulang file log (baris terakhir yang terpotong diabaikan)"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        break
+                    if op['op'] == 'push':
+                        self._push(op['id'])
+                    elif self._items:
+                        self._pop()
+                    self._log_lines += 1
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error memuat riwayat: {e}")
+
+    def _log(self, op):
+        if not self.path:
+            return
+        try:
+            if self._log_lines >= self.compact_after:
+                self.compact()  # Isi buffer sudah termasuk op ini
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(op) + '\n')
+            self._log_lines += 1
+        except Exception as e:
+            # Riwayat bukan data penting: cukup dicatat, pemutaran jalan terus
+            print(f"Error menyimpan riwayat: {e}")
+
+    def compact(self):
+        """Tulis ulang log menjadi isi buffer saat ini"""
+        atomic_write(self.path, ''.join(json.dumps({'op': 'push', 'id': song_id}) + '\n'
+                                        for song_id in self._items))
+        self._log_lines = len(self._items)
+
+
+class PlayedIds:
+    """Lagu yang sudah diputar: isi history ditambah lagu yang sedang diputar
+
+    Dipakai sebagai exclude rekomendasi tanpa menyalin history; `in` O(1).
+    """
+    def __init__(self, history, current_id):
+        self.history = history
+        self.current_id = current_id
+
+    def __contains__(self, song_id):
+        return song_id == self.current_id or song_id in self.history
+
+    def __iter__(self):
+        yield self.current_id
+        yield from self.history
+
+    def __len__(self):
+        return len(self.history) + 1
+
+
+class PlayQueue:
+    """Antrean putar: deque ID lagu (O(1) di kedua ujung)
+
+    Yang disimpan hanya ID, sehingga memasukkan playlist/hasil pencarian
+    besar sekaligus tidak menyalin record lagu; ID di-resolve lewat
+    songs_by_id saat dibaca, dan lagu yang sudah dihapus dari library
+    dilewati. Setiap perubahan menjadwalkan penulisan file antrean lewat
+    BackgroundWriter (perubahan beruntun digabung jadi satu penulisan).
+    """
+    def __init__(self, songs_by_id, path='play_queue.json', writer=None):
+        self.songs_by_id = songs_by_id
+        self.path = path
+        self.writer = writer
+        self._ids = deque()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __bool__(self):
+        return bool(self._ids)
+
+    def items(self):
+        """(ID, record atau None jika sudah dihapus) untuk setiap posisi antrean"""
+        return [(song_id, self.songs_by_id.get(song_id)) for song_id in self._ids]
+
+    def songs(self, limit=None):
+        """Record lagu dalam antrean, dari yang paling depan"""
+        songs = []
+        for song_id in self._ids:
+            song = self.songs_by_id.get(song_id)
+            if song is not None:
+                songs.append(song)
+                if limit is not None and len(songs) >= limit:
+                    break
+        return songs
+
+    # ==================== OPERASI ====================
+    def enqueue(self, song_id):
+        self._ids.append(song_id)
+        self._changed()
+
+    def play_next(self, song_id):
+        """Taruh lagu di depan antrean"""
+        self._ids.appendleft(song_id)
+        self._changed()
+
+    def extend(self, song_ids, front=False):
+        """Masukkan banyak lagu sekaligus (di belakang, atau di depan dengan urutan tetap)"""
+        if front:
+            self._ids.extendleft(reversed(list(song_ids)))
+        else:
+            self._ids.extend(song_ids)
+        self._changed()
+
+    def popleft(self):
+        """Ambil lagu terdepan yang masih ada di library; None jika antrean habis"""
+        if not self._ids:
+            return None  # Tidak ada yang berubah, tidak perlu menulis file
+        song = None
+        while self._ids and song is None:
+            song = self.songs_by_id.get(self._ids.popleft())
+        self._changed()
+        return song
+
+    def remove(self, index):
+        del self._ids[index]
+        self._changed()
+
+    def move(self, old_index, new_index):
+        song_id = self._ids[old_index]
+        del self._ids[old_index]
+        self._ids.insert(new_index, song_id)
+        self._changed()
+
+    def clear(self):
+        self._ids.clear()
+        self._changed()
+
+    # ==================== PENYIMPANAN ====================
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._ids = deque(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error memuat antrean: {e}")
+
+    def _changed(self):
+        if not self.path or self.writer is None:
+            return
+        ids = list(self._ids)  # Salinan ID diambil di thread UI
+        self.writer.submit('play_queue', lambda: self.write(ids))
+
+    def write(self, ids):
+        try:
+            atomic_write(self.path, json.dumps(ids))
+        except Exception as e:
+            raise Exception(f"Gagal menyimpan antrean: {e}")
+
+
+class ShuffleOrder:
+    """Urutan acak lazy (Fisher-Yates bertahap) untuk mode shuffle
+
+    Permutasi tidak dibuat di depan: array index dianggap identitas dan
+    hanya posisi yang pernah ditukar yang dicatat di dict, sehingga memulai
+    shuffle dan setiap lagu berikutnya O(1). Seed yang sama atas entri yang
+    sama menghasilkan urutan yang sama.
+
+    entries (library atau entri mentah playlist) dibaca langsung, tidak
+    disalin; hanya len(entries) saat mulai yang dipakai. Pemilik list wajib
+    memanggil detach() sebelum menggeser/mengurutkan isinya di tempat.
+
+    Lagu yang sudah diundi disimpan di `order`; prev()/next() berjalan di
+    sana dulu sebelum mengundi lagu baru. Lagu yang ditambahkan selama sesi
+    masuk ke bagian yang belum diundi, lagu yang dihapus dilewati saat
+    muncul, jadi urutan yang sudah ada tidak pernah diacak ulang.
+    """
+    def __init__(self, entries, seed, first=None):
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._base = entries  # Record lagu, ID, atau entri playlist mentah
+        self._base_size = len(entries)
+        self._added = []  # ID yang ditambahkan selama sesi
+        self._counts = None  # ID -> jumlah posisi (dibangun saat pertama dibutuhkan)
+        self._consumed = Counter()  # ID -> jumlah posisinya yang sudah diundi
+        self._swaps = {}  # posisi -> slot, hanya untuk posisi yang sudah ditukar
+        self._drawn = 0  # Posisi [0, _drawn) sudah diundi
+        self._removed = set()
+        self._skip = set()  # Diundi tapi sudah diputar sebelum sesi dimulai
+        self.order = []  # ID lagu dalam urutan acak yang sudah diundi
+        self.position = -1  # Index lagu yang sedang diputar di order
+        if first is not None:
+            self.order.append(first)
+            self._skip.add(first)
+            self.position = 0
+
+    def __len__(self):
+        return self._base_size + len(self._added)
+
+    # ==================== NAVIGASI ====================
+    def next(self):
+        """ID lagu berikutnya; None jika semua lagu sudah diputar"""
+        position = self.position + 1
+        while self._fill(position + 1):
+            if self.order[position] not in self._removed:
+                self.position = position
+                return self.order[position]
+            position += 1
+        return None
+
+    def prev(self):
+        """ID lagu sebelumnya di urutan acak; None jika sudah di awal"""
+        position = self.position - 1
+        while position >= 0:
+            if self.order[position] not in self._removed:
+                self.position = position
+                return self.order[position]
+            position -= 1
+        return None
+
+    def peek(self, limit):
+        """Hingga limit ID berikutnya tanpa memajukan posisi (untuk prefetch)"""
+        result = []
+        position = self.position + 1
+        while len(result) < limit and self._fill(position + 1):
+            if self.order[position] not in self._removed:
+                result.append(self.order[position])
+            position += 1
+        return result
+
+    def _fill(self, count):
+        """Undi lagu sampai order berisi count lagu (False jika tidak cukup)"""
+        while len(self.order) < count:
+            song_id = self._draw()
+            if song_id is None:
+                return False
+            if song_id in self._skip:
+                self._skip.discard(song_id)
+                continue
+            self.order.append(song_id)
+        return True
+
+    def _draw(self):
+        """Satu langkah Fisher-Yates: tukar posisi _drawn dengan posisi acak sesudahnya"""
+        size = len(self)
+        while self._drawn < size:
+            k = self._drawn
+            j = self._rng.randrange(k, size)
+            picked = self._swaps.get(j, j)
+            # Posisi k tidak dibaca lagi; slot miliknya pindah ke posisi j
+            moved = self._swaps.pop(k, k)
+            if j != k:
+                self._swaps[j] = moved
+            self._drawn += 1
+            if picked < self._base_size:
+                song_id = entry_id(self._base[picked])
+            else:
+                song_id = self._added[picked - self._base_size]
+            self._consumed[song_id] += 1
+            if song_id not in self._removed:
+                return song_id
+        return None
+
+    # ==================== PERUBAHAN ====================
+    def add(self, song_id):
+        """Lagu baru ikut diundi di antara lagu yang belum diputar"""
+        if song_id in self._removed:
+            self._removed.discard(song_id)
+            if self._position_count(song_id) > self._consumed[song_id]:
+                return  # Posisi lamanya belum diundi; cukup batal dihapus
+        self._added.append(song_id)
+        if self._counts is not None:
+            self._counts[song_id] += 1
+
+    def detach(self):
+        """Salin entri dasar agar list sumber boleh diubah di tempat (O(n), sekali)"""
+        if not isinstance(self._base, tuple):
+            self._base = tuple(islice(self._base, self._base_size))
+
+    def _position_count(self, song_id):
+        """Jumlah posisi song_id di urutan (entri dasar + tambahan)"""
+        if self._counts is None:
+            self._counts = Counter(entry_id(e) for e in islice(self._base, self._base_size))
+            self._counts.update(self._added)
+        return self._counts[song_id]
+
+    def remove(self, song_id):
+        """Lagu dihapus: dilewati di mana pun posisinya"""
+        self._removed.add(song_id)
@@ -1,6 +1,6 @@
 import tkinter as tk
-from tkinter import simpledialog, messagebox, filedialog
-import os
+from tkinter import messagebox, filedialog
+from models import entry_id
 
 class PlaylistController:
     """Controller untuk fitur playlist"""
@@ -28,8 +28,10 @@ class PlaylistController:
         new_playlist.description = description
         
         self.app.playlists[name] = new_playlist
-        self.app.save_to_json()
+        self.app.save_to_json({'op': 'playlist_create', 'name': name,
+                               'image_path': image_path, 'description': description})
         self.refresh_playlist_buttons()
+        self.app.playlist_sidebar.see(name)
         messagebox.showinfo("Sukses", f"Playlist '{name}' berhasil dibuat!")
     
     def delete_playlist(self, playlist_name):
@@ -40,7 +42,7 @@ class PlaylistController:
         
         if messagebox.askyesno("Konfirmasi", f"Hapus playlist '{playlist_name}'?"):
             del self.app.playlists[playlist_name]
-            self.app.save_to_json()
+            self.app.save_to_json({'op': 'playlist_delete', 'name': playlist_name})
             self.refresh_playlist_buttons()
             
             if self.app.selected_playlist == playlist_name:
@@ -56,6 +58,9 @@ class PlaylistController:
                              activebackground=self.app.colors['accent'], 
                              activeforeground=self.app.colors['white'])
         
+        options_menu.add_command(label="➕ Tambah ke Antrean", 
+                                command=lambda: self.enqueue_playlist(playlist_name))
+        
         # Opsi Edit Playlist (Deskripsi/Nama/Kover)
         if playlist_name != 'My Favorites':
             options_menu.add_command(label="✏ Edit Playlist", 
@@ -77,6 +82,16 @@ class PlaylistController:
         finally:
             options_menu.grab_release()
     
+    def enqueue_playlist(self, playlist_name):
+        """Tambah seluruh isi playlist ke antrean (hanya ID, playlist tidak perlu dimuat)"""
+        playlist = self.app.playlists[playlist_name]
+        if playlist.is_loaded:
+            song_ids = [s['id'] for s in playlist.to_list()]
+        else:
+            song_ids = [entry_id(e) for e in playlist.raw_entries()]
+        self.app.play_queue.extend(song_ids)
+        messagebox.showinfo("Queue", f"{len(song_ids)} lagu dari '{playlist_name}' ditambahkan ke antrean!")
+    
     def change_playlist_cover(self, playlist_name):
         """Ubah gambar cover playlist"""
         file_path = filedialog.askopenfilename(
@@ -86,10 +101,10 @@ class PlaylistController:
         
         if file_path:
             self.app.playlists[playlist_name].image_path = file_path
-            self.app.save_to_json()
+            self.app.save_to_json({'op': 'playlist_update', 'name': playlist_name,
+                                   'image_path': file_path})
             
-            # Refresh UI
-            self.refresh_playlist_buttons() 
+            # Refresh UI (sidebar tidak menampilkan kover)
             if self.app.current_view == 'playlist' and self.app.selected_playlist == playlist_name:
                 self.show_playlist(playlist_name)
                 
@@ -131,7 +146,9 @@ class PlaylistController:
         playlist.description = new_desc
         playlist.image_path = new_image
         
-        self.app.save_to_json()
+        self.app.save_to_json({'op': 'playlist_update', 'name': playlist_name,
+                               'new_name': new_name, 'image_path': new_image,
+                               'description': new_desc})
         self.refresh_playlist_buttons()
         
         # Refresh view jika sedang dibuka
@@ -141,52 +158,17 @@ class PlaylistController:
         messagebox.showinfo("Sukses", "Playlist berhasil diperbarui!")
 
     def refresh_playlist_buttons(self):
-        """Perbarui daftar tombol playlist di sidebar"""
-        from PIL import Image, ImageTk
-        import os
-        
-        for widget in self.app.playlist_frame.winfo_children():
-            widget.destroy()
-        
-        self.app.playlist_icons = {} # Keep references
-        
-        for playlist_name in self.app.playlists.keys():
-            # Frame untuk setiap playlist (button + menu titik 3)
-            playlist_container = tk.Frame(self.app.playlist_frame, 
-                                        bg=self.app.colors['bg_sec'])
-            playlist_container.pack(fill='x', pady=3)
-            
-            # Tombol playlist (Tanpa icon di sidebar)
-            btn = tk.Button(playlist_container, text="🎶 " + playlist_name, 
-                          font=('Arial', 10), bg=self.app.colors['accent_dark'], 
-                          fg=self.app.colors['white'], relief='flat', anchor='w', 
-                          padx=20, pady=4,
-                          command=lambda p=playlist_name: self.show_playlist(p))
-            btn.pack(side='left', fill='x', expand=True)
-            
-            # Tombol titik 3 untuk opsi (hapus/edit)
-            # Logika: My Favorites hanya bisa diedit admin. Playlist lain bisa diedit user/admin.
-            show_menu = True
-            if playlist_name == 'My Favorites' and self.app.role != 'admin':
-                show_menu = False
-            
-            if show_menu:
-                menu_btn = tk.Button(playlist_container, text="⋮", font=('Arial', 14),
-                                  bg=self.app.colors['bg_sec'], 
-                                  fg=self.app.colors['text_sec'], 
-                                  relief='flat', width=2, cursor='hand2',
-                                  command=lambda p=playlist_name: 
-                                  self.show_playlist_options(p))
-                menu_btn.pack(side='right', padx=2)
+        """Samakan sidebar dengan daftar playlist (widget baris dipakai ulang per nama)"""
+        self.app.playlist_sidebar.set_playlists(self.app.playlists)
     
     def add_to_playlist(self, playlist_name):
         """Tambah lagu ke playlist"""
-        selection = self.app.tree.selection()
-        if not selection:
+        selected = self.app.song_list.selected_song()
+        if not selected:
             return
         
-        song_id = self.app.tree.item(selection[0])['values'][0]
-        song = next((s for s in self.app.library if s['id'] == song_id), None)
+        song_id = selected['id']
+        song = self.app.song_index.get(song_id)
         
         if song:
             # Cek jika playlist adalah My Favorites
@@ -196,8 +178,10 @@ class PlaylistController:
                     "Gunakan menu 'Tambah ke Favorite' untuk menambahkan lagu.")
                 return
             
-            self.app.playlists[playlist_name].append(song.copy())
-            self.app.save_to_json()
+            self.app.playlists[playlist_name].append(song)
+            self.app.playlist_changed(playlist_name, added=song_id)
+            self.app.save_to_json({'op': 'playlist_add', 'name': playlist_name,
+                                   'id': song_id})
             messagebox.showinfo("Sukses", 
                               f"Lagu ditambahkan ke playlist '{playlist_name}'")
     
@@ -228,17 +212,19 @@ class PlaylistController:
         if self.app.current_view != 'playlist' or not self.app.selected_playlist:
             return
         
-        selection = self.app.tree.selection()
-        if not selection:
+        selected = self.app.song_list.selected_song()
+        if not selected:
             return
         
-        song_id = self.app.tree.item(selection[0])['values'][0]
+        song_id = selected['id']
         
         removed = self.app.playlists[self.app.selected_playlist].remove(song_id)
         
         if removed:
-            self.app.save_to_json()
-            self.app.refresh_song_list()
+            self.app.playlist_changed(self.app.selected_playlist, removed=song_id)
+            self.app.save_to_json({'op': 'playlist_remove',
+                                   'name': self.app.selected_playlist, 'id': song_id})
+            self.app.song_list.remove_song(song_id)
             messagebox.showinfo("Sukses", "Lagu dihapus dari playlist!")
         else:
             messagebox.showwarning("Gagal", "Lagu tidak ditemukan dalam playlist!")
\ No newline at end of file
@@ -0,0 +1,107 @@
+class Prefetcher:
+    """Siapkan lagu-lagu yang kemungkinan besar diputar berikutnya
+
+    Setiap kali lagu mulai diputar, sesaat kemudian (root.after) diprediksi
+    hingga depth lagu berikutnya: kepala play_queue, node.next di playlist
+    yang sedang dibuka, lagu berikutnya di urutan acak (mode shuffle), atau
+    rekomendasi smart di library, ditambah lagu untuk tombol Previous. Cover lagu-lagu itu dimuat ke ThumbnailCache
+    dan rekomendasi library disimpan, sehingga next_song/prev_song tidak
+    perlu menunggu decode gambar atau menghitung ulang rekomendasi.
+
+    hits/misses menghitung apakah lagu yang mulai diputar termasuk
+    prediksi sebelumnya (untuk menyetel depth).
+    """
+    def __init__(self, app, depth=3, delay_ms=50):
+        self.app = app
+        self.depth = depth
+        self.delay_ms = delay_ms
+        self.predicted = []  # ID lagu hasil prediksi terakhir
+        self.hits = 0
+        self.misses = 0
+        self._current_id = None
+        self._job = None
+        self._recommendation = None  # (state, lagu) rekomendasi library terakhir
+
+    def song_started(self, song):
+        """Dipanggil setiap player diperbarui; hanya bereaksi jika lagunya berganti"""
+        song_id = song['id'] if song else None
+        if song_id == self._current_id:
+            return
+        self._current_id = song_id
+        if song_id is None:
+            return
+        if self.predicted:
+            if song_id in self.predicted:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if self._job is not None:
+            self.app.root.after_cancel(self._job)
+        # Setelah player selesai digambar, bukan di tengah pergantian lagu
+        self._job = self.app.root.after(self.delay_ms, self.prefetch)
+
+    def prefetch(self):
+        self._job = None
+        upcoming = self.upcoming()
+        self.predicted = [s['id'] for s in upcoming]
+        for song in upcoming:
+            self.app.thumbnails.warm(song.get('image_path'), (60, 60))
+
+    def upcoming(self):
+        """Lagu yang mungkin diputar setelah (atau sebelum) lagu sekarang"""
+        app = self.app
+        song = app.current_song
+        if not song:
+            return []
+        result = app.play_queue.songs(self.depth)
+
+        if app.shuffle_mode:
+            for song_id in app.user_controller.shuffle_order().peek(self.depth):
+                if song_id in app.song_index:
+                    result.append(app.song_index[song_id])
+        elif app.current_view == 'playlist' and app.selected_playlist in app.playlists:
+            playlist = app.playlists[app.selected_playlist]
+            context = app.user_controller.last_context_song
+            node = playlist.find_node(song['id'])
+            if not node and context:
+                node = playlist.find_node(context['id'])
+            if node:
+                if node.prev:
+                    result.append(node.prev.data)
+                node = node.next
+                while node and len(result) < self.depth + 1:
+                    result.append(node.data)
+                    node = node.next
+        else:
+            if len(result) < self.depth:
+                recommended = self.recommendation()
+                if recommended:
+                    result.append(recommended)
+            history = app.played_history
+            if len(history) > 1 and history[-2] in app.song_index:
+                result.append(app.song_index[history[-2]])
+
+        seen = set()
+        return [s for s in result if s['id'] not in seen and not seen.add(s['id'])]
+
+    # ==================== REKOMENDASI ====================
+    def recommendation(self):
+        """UserController.recommend_next(), disimpan selama state pemutaran sama"""
+        app = self.app
+        context = app.user_controller.last_context_song
+        state = (app.current_song['id'] if app.current_song else None,
+                 context['id'] if context else None,
+                 app.played_history.version)
+        if self._recommendation is None or self._recommendation[0] != state:
+            self._recommendation = (state, app.user_controller.recommend_next())
+        return self._recommendation[1]
+
+    def invalidate(self):
+        """Buang rekomendasi tersimpan (dipanggil saat library berubah)"""
+        self._recommendation = None
+
+    def stats(self):
+        """Hit/miss prediksi lagu dan cache cover, untuk menyetel depth"""
+        return {'depth': self.depth, 'hits': self.hits, 'misses': self.misses,
+                'cover_hits': self.app.thumbnails.hits,
+                'cover_misses': self.app.thumbnails.misses}
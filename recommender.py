@@ -0,0 +1,204 @@
+from bisect import bisect_left
+from columnar import as_int, np
+
+# Prioritas rekomendasi: lagu dengan artist yang sama dulu, lalu album, dst.
+PRIORITY_FIELDS = ('artist', 'album', 'genre', 'year')
+
+
+class Recommender:
+    """Index untuk rekomendasi smart: Artist > Album > Genre > Year > Judul
+
+    Untuk setiap field prioritas disimpan bucket nilai -> list (judul
+    lowercase, urutan library, id), ditambah satu list untuk seluruh
+    library. Urutannya sama dengan candidates yang disort per judul
+    (stabil terhadap urutan library): recommend() mengembalikan lagu
+    pertama yang belum diputar di bucket artist anchor, lalu album, genre,
+    tahun, lalu seluruh library. Lagu yang dilewati hanya yang ada di
+    exclude, sehingga biaya per rekomendasi tidak bergantung pada ukuran
+    library.
+
+    Entri baru cukup ditambahkan di akhir list (add_many dipanggil per
+    batch saat load); list yang jadi tidak urut diurutkan saat pertama kali
+    dipakai.
+    """
+    def __init__(self, library, songs_by_id):
+        self.library = library
+        self.songs_by_id = songs_by_id
+        self._reset()
+        self.add_many(library)
+
+    def _reset(self):
+        self._all = []
+        self._buckets = {field: {} for field in PRIORITY_FIELDS}
+        self._entries = {}  # id -> (entry, nilai field) untuk menghapus dari bucket
+        self._unsorted = set()  # id() list yang perlu diurutkan sebelum dipakai
+        self._seq = 0
+        self._dirty = False
+
+    def invalidate(self, library=None, songs_by_id=None):
+        """Bangun ulang saat dipakai berikutnya (mis. urutan library berubah)"""
+        if library is not None:
+            self.library = library
+        if songs_by_id is not None:
+            self.songs_by_id = songs_by_id
+        self._dirty = True
+
+    # ==================== REKOMENDASI ====================
+    def recommend(self, anchor, exclude):
+        """Lagu pertama (urut judul) yang tidak ada di exclude, menurut prioritas field"""
+        if self._dirty:
+            self._reset()
+            self.add_many(self.library)
+        for field in PRIORITY_FIELDS:
+            bucket = self._buckets[field].get(anchor.get(field))
+            song = bucket and self._first(bucket, exclude)
+            if song:
+                return song
+        return self._first(self._all, exclude)
+
+    def _first(self, entries, exclude):
+        if id(entries) in self._unsorted:
+            entries.sort()
+            self._unsorted.discard(id(entries))
+        for _, _, song_id in entries:
+            if song_id not in exclude:
+                return self.songs_by_id.get(song_id)
+        return None
+
+    # ==================== PEMELIHARAAN ====================
+    def add(self, song):
+        """Lagu baru ditambahkan di akhir library"""
+        self.add_many((song,))
+
+    def add_many(self, songs):
+        if self._dirty:
+            return
+        for song in songs:
+            if song['id'] in self._entries:
+                self.remove(song['id'])
+            self._append(song, self._seq)
+            self._seq += 1
+
+    def _append(self, song, seq):
+        entry = (song['title'].lower(), seq, song['id'])
+        values = (song.get('artist'), song.get('album'), song.get('genre'), song.get('year'))
+        self._entries[entry[2]] = (entry, values)
+        self._push(self._all, entry)
+        for buckets, value in zip(self._buckets.values(), values):
+            bucket = buckets.get(value)
+            if bucket is None:
+                buckets[value] = [entry]
+            else:
+                self._push(bucket, entry)
+
+    def _push(self, entries, entry):
+        if entries[-1:] and entries[-1] > entry:
+            self._unsorted.add(id(entries))
+        entries.append(entry)
+
+    def remove(self, song_id):
+        if self._dirty:
+            return None
+        entry, values = self._entries.pop(song_id, (None, None))
+        if entry is None:
+            return None
+        self._discard(self._all, entry)
+        for buckets, value in zip(self._buckets.values(), values):
+            bucket = buckets[value]
+            self._discard(bucket, entry)
+            if not bucket:
+                self._unsorted.discard(id(bucket))
+                del buckets[value]
+        return entry
+
+    def update(self, song, old_id=None):
+        """Record diubah di tempat: posisinya di library (seq) tetap"""
+        if self._dirty:
+            return
+        entry = self.remove(song['id'] if old_id is None else old_id)
+        if entry is None:
+            self.add(song)
+        else:
+            self._append(song, entry[1])
+
+    def _discard(self, entries, entry):
+        if id(entries) in self._unsorted:
+            entries.remove(entry)
+            return
+        index = bisect_left(entries, entry)
+        if index < len(entries) and entries[index] == entry:
+            del entries[index]
+
+
+class SimilarityRecommender:
+    """Rekomendasi berbasis skor kemiripan di atas ColumnarLibrary (NumPy)
+
+    Berbeda dengan Recommender yang berhenti di kecocokan pertama, setiap
+    lagu library diberi skor dalam satu pass vektor: bobot kecocokan
+    artist/album/genre (kode kategori) ditambah kedekatan tahun dan durasi.
+    Anchor bisa satu lagu atau beberapa lagu terakhir di riwayat (lagu yang
+    lebih baru berbobot lebih besar). Lagu yang sudah diputar dibuang lewat
+    mask boolean, lalu top-k diambil dengan argpartition.
+    """
+    WEIGHTS = {'artist': 4.0, 'album': 3.0, 'genre': 2.0, 'year': 1.0, 'duration': 0.5}
+
+    def __init__(self, columns, weights=None, year_scale=5.0, duration_scale=60.0, decay=0.5):
+        self.columns = columns
+        self.weights = dict(self.WEIGHTS, **(weights or {}))
+        self.year_scale = year_scale          # Selisih tahun yang membuat skor tahun jadi 1/2
+        self.duration_scale = duration_scale  # Sama untuk durasi (detik)
+        self.decay = decay                    # Bobot anchor ke-n dari belakang = decay ** n
+
+    def recommend(self, anchor_ids, exclude=(), top_k=10):
+        """Record lagu paling mirip dengan anchor_ids (terbaru di akhir), skor terbesar dulu"""
+        columns = self.columns
+        columns.ensure()
+        ids = columns.ids
+        if not len(ids):
+            return []
+        rows = self._rows(anchor_ids)
+        if not len(rows):
+            return []
+
+        scores = np.zeros(len(ids))
+        total = 0.0
+        for age, row in enumerate(reversed(rows)):
+            weight = self.decay ** age
+            scores += weight * self._similarity(row)
+            total += weight
+        scores /= total
+
+        # Lagu yang sudah diputar (dan anchor sendiri) tidak ikut dipilih
+        banned = np.isin(ids, np.fromiter((as_int(i) for i in exclude), dtype=np.int64,
+                                          count=len(exclude)))
+        banned[rows] = True
+        scores[banned] = -np.inf
+
+        k = min(top_k, int((~banned).sum()))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return columns.take(best)
+
+    def _rows(self, anchor_ids):
+        """Baris library untuk anchor_ids, urutan sesuai anchor_ids"""
+        ids = self.columns.ids
+        rows = []
+        for song_id in anchor_ids:
+            found = np.flatnonzero(ids == as_int(song_id))
+            if len(found):
+                rows.append(found[0])
+        return np.array(rows, dtype=np.intp)
+
+    def _similarity(self, row):
+        columns = self.columns
+        w = self.weights
+        score = np.zeros(len(columns.ids))
+        for field in ('artist', 'album', 'genre'):
+            codes = columns.codes[field]
+            score += w[field] * (codes == codes[row])
+        score += w['year'] / (1.0 + np.abs(columns.years - columns.years[row]) / self.year_scale)
+        score += w['duration'] / (1.0 + np.abs(columns.durations - columns.durations[row])
+                                  / self.duration_scale)
+        return score
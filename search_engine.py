@@ -0,0 +1,465 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+GRAM = 3
+# Token sepanjang ini atau kurang juga dicari lewat varian hapus-satu-huruf,
+# karena satu salah ketik saja sudah bisa menghapus semua trigramnya
+SHORT_TOKEN = 6
+# Bobot field untuk pencarian fuzzy, urutannya sama dengan song_terms()
+FIELD_WEIGHTS = (4.0, 3.0, 1.0, 2.0, 0.5, 0.5)  # title, artist, genre, album, id, year
+# Bobot terbesar untuk setiap kombinasi bit field
+MASK_WEIGHTS = [max((w for i, w in enumerate(FIELD_WEIGHTS) if mask >> i & 1), default=0.0)
+                for mask in range(1 << len(FIELD_WEIGHTS))]
+
+
+def song_terms(song):
+    """Nilai field yang dicari, sama persis dengan filter lama di refresh_song_list"""
+    return (song['title'].lower(), song['artist'].lower(), song['genre'].lower(),
+            song['album'].lower(), str(song['id']), str(song['year']))
+
+
+def grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def matches(song, query):
+    return any(query in term for term in song_terms(song))
+
+
+def edit_distance(word, token):
+    """Jarak edit (dengan transposisi) word ke token dan ke awalan token terbaik
+
+    Mengembalikan (jarak penuh, jarak ke awalan); jarak awalan membuat
+    ketikan yang belum selesai ('coldp') tetap cocok dengan 'coldplay'.
+    """
+    m, n = len(word), len(token)
+    prev2 = None
+    prev = list(range(n + 1))
+    for i in range(1, m + 1):
+        cur = [i] + [0] * n
+        a = word[i - 1]
+        for j in range(1, n + 1):
+            b = token[j - 1]
+            cost = 0 if a == b else 1
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and a == token[j - 2] and word[i - 2] == b:
+                d = min(d, prev2[j - 2] + 1)
+            cur[j] = d
+        prev2, prev = prev, cur
+    return prev[n], min(prev)
+
+
+def deletions(token):
+    """token beserta semua varian dengan satu huruf dihapus"""
+    return {token} | {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def is_short_word(token):
+    """Token pendek non-angka (ID/tahun tidak perlu toleransi salah ketik)"""
+    return len(token) <= SHORT_TOKEN and not token.isdigit()
+
+
+def max_edits(word):
+    """Jumlah salah ketik yang masih ditoleransi untuk kata sepanjang word"""
+    if len(word) <= 2:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+class SearchIndex:
+    """Inverted index token + trigram untuk pencarian substring di library
+
+    Setiap kata (token) dari title/artist/genre/album/id/year menunjuk ke
+    daftar nomor dokumen (array int, hemat memori), dan setiap trigram
+    menunjuk ke kata-kata yang mengandungnya. Kosakata jauh lebih kecil dari
+    jumlah lagu, sehingga query cukup dicocokkan ke kosakata lalu daftar
+    dokumennya digabung/diiris. Hasilnya sama dengan scan linear lama.
+    Perubahan lagu ditangani dengan menandai dokumen lama sebagai mati
+    (tombstone); index dipadatkan otomatis saat dokumen mati terlalu banyak.
+    """
+    def __init__(self, songs_by_id):
+        self.songs_by_id = songs_by_id
+        self._postings = {}   # token -> array nomor dokumen (naik)
+        self._masks = {}      # token -> array bit field tempat token muncul (sejajar posting)
+        # Struktur bantu fuzzy, dibuat saat pertama kali dipakai
+        self._vocabulary = None  # Kosakata terurut untuk pencarian awalan
+        self._deletes = None     # varian hapus-satu-huruf -> token pendek
+        self._groups = {}        # token umum -> [(bobot, array dokumen)]
+        self._grams = {}      # trigram -> set token
+        self._doc_ids = []    # nomor dokumen -> song id (None = sudah mati)
+        self._docno = {}      # song id -> nomor dokumen yang hidup
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._docno)
+
+    def add(self, song):
+        song_id = song['id']
+        if song_id in self._docno:
+            self.remove(song_id)
+        docno = len(self._doc_ids)
+        self._doc_ids.append(song_id)
+        self._docno[song_id] = docno
+        masks = {}
+        for bit, term in enumerate(song_terms(song)):
+            for token in term.split():
+                masks[token] = masks.get(token, 0) | 1 << bit
+        postings = self._postings
+        for token, mask in masks.items():
+            posting = postings.get(token)
+            if posting is None:
+                posting = postings[token] = array('i')
+                self._masks[token] = array('B')
+                self._vocabulary = None
+                if self._deletes is not None and is_short_word(token):
+                    for variant in deletions(token):
+                        self._deletes.setdefault(variant, set()).add(token)
+                for gram in grams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+            posting.append(docno)
+            self._masks[token].append(mask)
+            self._groups.pop(token, None)
+
+    def add_many(self, songs):
+        for song in songs:
+            self.add(song)
+
+    def update(self, song):
+        self.add(song)
+
+    def remove(self, song_id):
+        docno = self._docno.pop(song_id, None)
+        if docno is None:
+            return
+        self._doc_ids[docno] = None
+        self._dead += 1
+        if self._dead > 1000 and self._dead > len(self._docno):
+            self.compact()
+
+    def compact(self):
+        """Buang dokumen mati dari semua posting dan beri nomor ulang"""
+        renumber = {}
+        doc_ids = []
+        for old, song_id in enumerate(self._doc_ids):
+            if song_id is not None:
+                renumber[old] = len(doc_ids)
+                doc_ids.append(song_id)
+        postings = {}
+        masks = {}
+        for token, posting in self._postings.items():
+            pairs = [(renumber[d], m) for d, m in zip(posting, self._masks[token]) if d in renumber]
+            if pairs:
+                postings[token] = array('i', (d for d, _ in pairs))
+                masks[token] = array('B', (m for _, m in pairs))
+            else:
+                for gram in grams(token):
+                    self._grams[gram].discard(token)
+        self._postings = postings
+        self._masks = masks
+        self._vocabulary = None
+        self._deletes = None
+        self._groups = {}
+        self._doc_ids = doc_ids
+        self._docno = {song_id: i for i, song_id in enumerate(doc_ids)}
+        self._dead = 0
+
+    def tokens_containing(self, word, starts=False, ends=False):
+        """Token di kosakata yang mengandung word (opsional: diawali/diakhiri word)"""
+        if starts and ends:
+            return [word] if word in self._postings else []
+        if len(word) < GRAM:
+            tokens = [token for token in self._postings if word in token]
+        else:
+            sets = sorted((self._grams.get(gram, ()) for gram in grams(word)), key=len)
+            if not sets[0]:
+                return []
+            tokens = [token for token in sets[0].intersection(*sets[1:]) if word in token]
+        if starts:
+            tokens = [token for token in tokens if token.startswith(word)]
+        elif ends:
+            tokens = [token for token in tokens if token.endswith(word)]
+        return tokens
+
+    def docs_containing(self, word, starts=False, ends=False):
+        docs = set()
+        for token in self.tokens_containing(word, starts, ends):
+            docs.update(self._postings[token])
+        return docs
+
+    def search(self, query):
+        """Set id lagu yang mengandung query (lowercase) di salah satu field
+
+        Mengembalikan None untuk query kosong (tidak ada filter).
+        """
+        songs_by_id = self.songs_by_id
+        words = query.split()
+        if not words:
+            if not query:
+                return None
+            return {i for i in self._docno if i in songs_by_id and matches(songs_by_id[i], query)}
+
+        # Kata yang diapit spasi di query pasti menjadi awal/akhir token di field
+        last = len(words) - 1
+        parts = [(word, k > 0 or query[0].isspace(), k < last or query[-1].isspace())
+                 for k, word in enumerate(words)]
+        parts.sort(key=lambda part: (part[1] and part[2], len(part[0])), reverse=True)
+        candidates = self.docs_containing(*parts[0])
+        for part in parts[1:]:
+            if not candidates:
+                break
+            candidates &= self.docs_containing(*part)
+
+        doc_ids = self._doc_ids
+        ids = {doc_ids[d] for d in candidates}
+        ids.discard(None)
+        # Satu kata tanpa spasi pasti berada di dalam satu token, jadi tidak
+        # perlu verifikasi; query bersepasi bisa melintasi batas kata/field
+        if len(words) == 1 and words[0] == query:
+            return ids
+        return {i for i in ids if i in songs_by_id and matches(songs_by_id[i], query)}
+
+    # ==================== FUZZY ====================
+    def prepare_fuzzy(self):
+        """Bangun kosakata terurut dan indeks varian hapus (sekali, saat mode fuzzy dipakai)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        if self._deletes is None:
+            self._deletes = {}
+            for token in self._postings:
+                if is_short_word(token):
+                    for variant in deletions(token):
+                        self._deletes.setdefault(variant, set()).add(token)
+
+    def similar_tokens(self, word, limit=200):
+        """Token kosakata yang mirip word: list (skor 0-1, token), skor terbesar dulu
+
+        Kandidat diambil dari token yang paling banyak berbagi trigram
+        dengan word (ditambah varian hapus-satu-huruf untuk kata pendek),
+        lalu dinilai dengan edit_distance.
+        """
+        edits = max_edits(word)
+        self.prepare_fuzzy()
+        if len(word) < GRAM:
+            # Terlalu pendek untuk trigram: cukup awalan token
+            vocabulary = self._vocabulary
+            start = bisect_left(vocabulary, word)
+            end = bisect_left(vocabulary, word + '\uffff', start)
+            return sorted(((1.0 if token == word else 0.9, token)
+                           for token in vocabulary[start:end][:limit]), reverse=True)
+
+        overlap = Counter()
+        for gram in grams(word):
+            overlap.update(self._grams.get(gram, ()))
+        candidates = {token for token, _ in overlap.most_common(limit)}
+        if len(word) <= SHORT_TOKEN:
+            for variant in deletions(word):
+                candidates.update(self._deletes.get(variant, ()))
+
+        result = []
+        for token in candidates:
+            if len(token) < len(word) - edits:
+                continue
+            full, prefix = edit_distance(word, token)
+            if prefix > edits:
+                continue
+            if full and sorted(word) == sorted(token):
+                full -= 0.5  # Huruf tertukar ('lvoe') lebih umum daripada huruf salah
+            # Kata utuh lebih tinggi dari awalan kata yang lebih panjang
+            score = max(1 - full / len(word), 0.9 * (1 - prefix / len(word)))
+            result.append((score, token))
+        result.sort(reverse=True)
+        return result
+
+    def _weight_groups(self, token):
+        """Dokumen token dikelompokkan per bobot field, bobot terbesar dulu"""
+        groups = self._groups.get(token)
+        if groups is None:
+            by_weight = {}
+            for docno, mask in zip(self._postings[token], self._masks[token]):
+                by_weight.setdefault(MASK_WEIGHTS[mask], array('i')).append(docno)
+            groups = sorted(by_weight.items(), reverse=True)
+            if len(self._postings[token]) > 256:
+                self._groups[token] = groups
+        return groups
+
+    def _score_postings(self, similar, budget):
+        """Skor per dokumen dari posting token mirip (maksimal budget dokumen)"""
+        best = {}
+        for similarity, token in similar:
+            for weight, docs in self._weight_groups(token):
+                score = similarity * weight
+                for docno in docs[:budget]:
+                    if score > best.get(docno, 0.0):
+                        best[docno] = score
+                budget -= len(docs)
+                if budget <= 0:
+                    return best
+        return best
+
+    def _score_within(self, candidates, similar):
+        """Seperti _score_postings, tapi hanya untuk dokumen di set candidates"""
+        best = {}
+        if len(candidates) < sum(len(self._postings[token]) for _, token in similar):
+            # Kandidat lebih sedikit dari posting: nilai langsung dari record
+            lookup = dict((token, similarity) for similarity, token in similar)
+            for docno in candidates:
+                score = self._word_score(self._tokens(docno), lookup)
+                if score:
+                    best[docno] = score
+            return best
+        for similarity, token in similar:
+            for weight, docs in self._weight_groups(token):
+                score = similarity * weight
+                for docno in candidates.intersection(docs):
+                    if score > best.get(docno, 0.0):
+                        best[docno] = score
+        return best
+
+    def fuzzy_search(self, query, top_k=50, allowed=None, budget=2000):
+        """ID lagu yang paling mirip query, terurut dari skor tertinggi
+
+        Skor lagu = jumlah skor setiap kata query, yaitu kemiripan token
+        terbaiknya dikali bobot field tempat token itu muncul (title >
+        artist > album > genre). allowed membatasi hasil ke sekumpulan ID
+        (mis. isi playlist).
+
+        Tanpa allowed, lagu yang cocok dengan semua kata dicari lewat
+        _scan(): posting kata yang paling jarang ditelusuri dari skor
+        terbaik dan setiap lagu diperiksa langsung dari record-nya. Jika
+        lagu yang cocok kurang dari top_k, tiap kata juga dinilai terpisah
+        dari posting teratasnya dan skornya dijumlahkan (lagu yang cocok
+        sebagian ikut).
+
+        budget membatasi total kerja kedua tahap: satu lagu yang diperiksa
+        terhadap satu kata, atau satu posting di tahap terpisah, dihitung
+        satu. _scan() mendapat 3/4 budget dan sisanya untuk tahap terpisah,
+        jadi waktu per query tidak bergantung pada jumlah atau seberapa umum
+        kata-katanya.
+        """
+        words = query.lower().split()
+        if not words:
+            return None
+        similar = [self.similar_tokens(word) for word in words]
+        volumes = [sum(len(self._postings[token]) for _, token in s) for s in similar]
+        order = sorted(range(len(words)), key=volumes.__getitem__)
+
+        if allowed is not None:
+            candidates = {self._docno[i] for i in allowed if i in self._docno}
+            scores = Counter()
+            for s in similar:
+                scores.update(self._score_within(candidates, s))
+        else:
+            # Kata tanpa token mirip sama sekali tidak dijadikan syarat
+            required = [similar[i] for i in order if similar[i]]
+            scores, spent = {}, 0
+            if required:
+                limit = (budget - budget // 4) // len(required)
+                scores, examined = self._scan(required, top_k, limit)
+                spent = examined * len(required)
+            if len(scores) < top_k:
+                # Lagu yang cocok semua kata tetap memakai skor penuhnya
+                scores = {**self._score_separately(similar, budget - spent), **scores}
+
+        doc_ids = self._doc_ids
+        ranked = ((score, doc_ids[docno]) for docno, score in scores.items())
+        ranked = ((score, song_id) for score, song_id in ranked if song_id is not None)
+        return [song_id for _, song_id in heapq.nlargest(top_k, ranked, key=lambda r: r[0])]
+
+    def _scan(self, similar, top_k, budget):
+        """(skor, jumlah lagu diperiksa) untuk lagu yang cocok dengan semua kata
+
+        Kelompok dokumen kata pertama (similar[0]) ditelusuri dari skor
+        terbesar; sisa kata dinilai dari token record lagu. Berhenti setelah
+        budget lagu, atau begitu lagu mana pun di kelompok berikutnya tidak
+        mungkin lagi masuk top_k (skor kata pertama + skor maksimal kata
+        lainnya).
+        """
+        lookups = [dict((token, similarity) for similarity, token in s) for s in similar]
+        rest = sum(s[0][0] for s in similar[1:]) * max(FIELD_WEIGHTS)
+        scores = {}
+        best = []  # min-heap top_k skor terbaik sejauh ini
+        seen = set()
+        for group_score, docs in self._ranked_groups(similar[0]):
+            bound = group_score + rest
+            if len(best) >= top_k and best[0] >= bound:
+                break
+            for docno in docs:
+                if docno in seen:
+                    continue
+                if len(best) >= top_k and best[0] >= bound:
+                    return scores, len(seen)
+                seen.add(docno)
+                score = self._match(docno, lookups)
+                if score:
+                    scores[docno] = score
+                    if len(best) < top_k:
+                        heapq.heappush(best, score)
+                    elif score > best[0]:
+                        heapq.heapreplace(best, score)
+                if len(seen) >= budget:
+                    return scores, len(seen)
+        return scores, len(seen)
+
+    def _ranked_groups(self, similar):
+        """(skor, dokumen) dari semua token mirip, skor terbesar dulu
+
+        Kelompok token baru dibangun saat skor maksimalnya bisa menyaingi
+        kelompok berikutnya, jadi token yang tidak pernah tercapai tidak
+        diproses.
+        """
+        top = max(FIELD_WEIGHTS)
+        pending = []  # heap (-skor, urutan, dokumen)
+        pushed = 0
+        tokens = iter(similar)
+        upcoming = next(tokens, None)
+        while True:
+            while upcoming and (not pending or upcoming[0] * top >= -pending[0][0]):
+                similarity, token = upcoming
+                for weight, docs in self._weight_groups(token):
+                    heapq.heappush(pending, (-similarity * weight, pushed, docs))
+                    pushed += 1
+                upcoming = next(tokens, None)
+            if not pending:
+                return
+            score, _, docs = heapq.heappop(pending)
+            yield -score, docs
+
+    def _tokens(self, docno):
+        """(token, bobot field) dari record lagu untuk docno"""
+        song_id = self._doc_ids[docno]
+        song = self.songs_by_id.get(song_id) if song_id is not None else None
+        if song is None:
+            return []
+        return [(token, weight) for weight, term in zip(FIELD_WEIGHTS, song_terms(song))
+                for token in term.split()]
+
+    @staticmethod
+    def _word_score(tokens, lookup):
+        """Skor terbaik satu kata query (lookup token -> kemiripan) di antara tokens"""
+        best = 0.0
+        for token, weight in tokens:
+            similarity = lookup.get(token)
+            if similarity is not None and similarity * weight > best:
+                best = similarity * weight
+        return best
+
+    def _match(self, docno, lookups):
+        """Jumlah skor setiap kata untuk satu dokumen; 0 jika ada kata yang tidak cocok"""
+        tokens = self._tokens(docno)
+        total = 0.0
+        for lookup in lookups:
+            best = self._word_score(tokens, lookup)
+            if not best:
+                return 0.0
+            total += best
+        return total
+
+    def _score_separately(self, similar, budget):
+        """Skor tiap kata dijumlahkan, masing-masing dari budget / jumlah kata dokumen teratasnya"""
+        scores = Counter()
+        share = max(budget // len(similar), 1)
+        for s in similar:
+            scores.update(self._score_postings(s, share))
+        return scores
@@ -0,0 +1,134 @@
+from bisect import bisect_left, insort
+from columnar import as_int, duration_seconds, normalize
+
+SORT_KEYS = {
+    'title': lambda s: s['title'].lower(),
+    'artist': lambda s: s['artist'].lower(),
+    'genre': lambda s: normalize(s.get('genre')),
+    'album': lambda s: normalize(s.get('album')),
+    'year': lambda s: as_int(s.get('year')),
+    'duration': lambda s: duration_seconds(s.get('duration')),
+    'id': lambda s: as_int(s['id']),
+}
+
+
+def sort_spec(order):
+    """Ubah [(kolom, reverse), ...] menjadi key untuk DoublyLinkedList.sort
+
+    ID ditambahkan sebagai kolom terakhir supaya hasilnya sama dengan
+    SortIndex.sort.
+    """
+    return [(SORT_KEYS[by], reverse) for by, reverse in order] + [(SORT_KEYS['id'], False)]
+
+
+def sort_before(order):
+    """Fungsi before(a, b): True jika lagu a berada sebelum b menurut order
+
+    Urutannya sama dengan SortIndex.sort (ID naik sebagai kolom terakhir),
+    untuk mencari posisi satu lagu di list yang sudah terurut.
+    """
+    spec = sort_spec(order)
+
+    def before(a, b):
+        for key, reverse in spec:
+            key_a, key_b = key(a), key(b)
+            if key_a != key_b:
+                return key_b < key_a if reverse else key_a < key_b
+        return False
+    return before
+
+
+class SortIndex:
+    """Urutan library yang sudah jadi untuk setiap kolom sort
+
+    Setiap urutan adalah list (key, id) terurut, dibangun saat pertama kali
+    dipakai lalu dipelihara per lagu (bisect) ketika lagu ditambah, diubah
+    atau dihapus. Menampilkan library dalam urutan tertentu cukup membaca
+    list tersebut (O(n)) tanpa mengubah urutan library aslinya.
+    """
+    # Batch lebih besar dari ini lebih murah dibangun ulang daripada disisipkan satu-satu
+    BULK_LIMIT = 64
+
+    def __init__(self, songs_by_id):
+        self.songs_by_id = songs_by_id
+        self._orders = {}  # kolom -> list (key, id) terurut
+        self._keys = {}    # kolom -> {id: key} (untuk mencari posisi lama)
+
+    def invalidate(self, songs_by_id=None):
+        """Buang semua urutan; dibangun ulang saat dipakai berikutnya"""
+        if songs_by_id is not None:
+            self.songs_by_id = songs_by_id
+        self._orders.clear()
+        self._keys.clear()
+
+    def _order(self, by):
+        order = self._orders.get(by)
+        if order is None:
+            key = SORT_KEYS[by]
+            keys = {song_id: key(song) for song_id, song in self.songs_by_id.items()}
+            order = sorted((k, song_id) for song_id, k in keys.items())
+            self._orders[by] = order
+            self._keys[by] = keys
+        return order
+
+    def ordered(self, by, reverse=False):
+        """Semua lagu library dalam urutan kolom by"""
+        order = self._order(by)
+        songs = self.songs_by_id
+        if not reverse:
+            return [songs[song_id] for _, song_id in order]
+        # Kelompok key dibalik, tapi lagu dengan key sama tetap urut ID naik
+        result = []
+        end = len(order)
+        while end:
+            start = bisect_left(order, (order[end - 1][0],), 0, end)
+            result.extend(songs[song_id] for _, song_id in order[start:end])
+            end = start
+        return result
+
+    def sort(self, songs, order):
+        """Urutkan lagu (hasil filter/playlist) tanpa mengubah list aslinya
+
+        order adalah list (kolom, reverse) dari kolom utama ke kolom terakhir.
+        Untuk satu kolom dan hasil yang besar, urutan yang sudah jadi cukup
+        disaring (O(n)); selain itu lagu diurutkan langsung, satu sort stabil
+        per kolom dengan key yang dihitung sekali per lagu.
+        """
+        if len(order) == 1 and len(songs) * 8 >= len(self.songs_by_id):
+            by, reverse = order[0]
+            wanted = {s['id']: s for s in songs}
+            # Hanya bisa jika setiap lagu muncul sekali dan ada di library
+            if len(wanted) == len(songs) and \
+                    all(self.songs_by_id.get(i) is s for i, s in wanted.items()):
+                return [s for s in self.ordered(by, reverse) if s['id'] in wanted]
+        result = sorted(songs, key=SORT_KEYS['id'])
+        for by, reverse in reversed(order):
+            result.sort(key=SORT_KEYS[by], reverse=reverse)
+        return result
+
+    # ==================== PEMELIHARAAN ====================
+    def add(self, song):
+        for by, order in self._orders.items():
+            k = SORT_KEYS[by](song)
+            self._keys[by][song['id']] = k
+            insort(order, (k, song['id']))
+
+    def add_many(self, songs):
+        if len(songs) > self.BULK_LIMIT:
+            self.invalidate()
+        else:
+            for song in songs:
+                self.add(song)
+
+    def remove(self, song_id):
+        for by, order in self._orders.items():
+            k = self._keys[by].pop(song_id, None)
+            if k is None:
+                continue
+            index = bisect_left(order, (k, song_id))
+            if index < len(order) and order[index] == (k, song_id):
+                del order[index]
+
+    def update(self, song, old_id=None):
+        self.remove(song['id'] if old_id is None else old_id)
+        self.add(song)
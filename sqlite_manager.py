@@ -0,0 +1,329 @@
+import json
+import sqlite3
+import sys
+import threading
+from models import DataManager, DoublyLinkedList, LazyPlaylist, entry_id
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    genre TEXT,
+    album TEXT,
+    year INTEGER,
+    duration TEXT,
+    favorite INTEGER NOT NULL DEFAULT 0,
+    image_path TEXT,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_songs_artist ON songs(artist);
+CREATE INDEX IF NOT EXISTS idx_songs_genre ON songs(genre);
+CREATE INDEX IF NOT EXISTS idx_songs_album ON songs(album);
+CREATE INDEX IF NOT EXISTS idx_songs_year ON songs(year);
+
+CREATE TABLE IF NOT EXISTS playlists (
+    name TEXT PRIMARY KEY,
+    image_path TEXT,
+    description TEXT NOT NULL DEFAULT '',
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS playlist_entries (
+    playlist TEXT NOT NULL REFERENCES playlists(name)
+        ON UPDATE CASCADE ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    song_id INTEGER NOT NULL,
+    PRIMARY KEY (playlist, position)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_song ON playlist_entries(song_id);
+
+-- Lagu di playlist yang tidak ada di library (entri dict format lama), disimpan utuh
+CREATE TABLE IF NOT EXISTS orphan_songs (
+    id INTEGER PRIMARY KEY,
+    record TEXT NOT NULL
+);
+"""
+
+SONG_COLUMNS = ('id', 'title', 'artist', 'genre', 'album', 'year',
+                'duration', 'favorite', 'image_path')
+
+
+class SQLiteDataManager:
+    """Penyimpanan data berbasis SQLite
+
+    Kontrak load_data/save_data sama dengan DataManager, ditambah operasi
+    per-lagu dan per-entri playlist sehingga setiap perubahan cukup menulis
+    baris yang berubah (id sudah terindeks sebagai PRIMARY KEY).
+    
+    Jika writer (BackgroundWriter) diberikan, append_op hanya mengantrekan
+    operasi; commit-nya dijalankan di thread writer, bukan thread UI.
+    """
+    def __init__(self, db_path='music_data.db', writer=None):
+        self.db_path = db_path
+        # Selalu menulis per operasi, tidak pernah butuh compaction
+        self.journal = True
+        self.writer = writer
+        self._pending_ops = []
+        self._ops_lock = threading.Lock()
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ==================== SNAPSHOT ====================
+    def load_data(self):
+        """Load seluruh library dan playlist dari database"""
+        for library, playlists, _ in self.load_data_incremental():
+            pass
+        return library, playlists
+
+    def load_data_incremental(self, batch_size=1000):
+        """Load bertahap per batch baris; yield (library, playlists, progress)"""
+        try:
+            library = []
+            playlists = {}
+            yield library, playlists, 0.0
+
+            with self._lock:
+                total = self.conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+                cursor = self.conn.execute(
+                    f"SELECT {', '.join(SONG_COLUMNS)} FROM songs ORDER BY position")
+            songs_by_id = {}
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    song = self._row_to_song(row)
+                    library.append(song)
+                    songs_by_id[song['id']] = song
+                yield library, playlists, 0.9 * len(library) / max(total, 1)
+
+            with self._lock:
+                orphans = {song_id: json.loads(record) for song_id, record
+                           in self.conn.execute("SELECT id, record FROM orphan_songs")}
+                for name, image_path, description in self.conn.execute(
+                        "SELECT name, image_path, description FROM playlists ORDER BY position"):
+                    playlist = LazyPlaylist(songs_by_id)
+                    playlist.image_path = image_path
+                    playlist.description = description
+                    playlists[name] = playlist
+                # Hanya ID yang dibaca; node dibangun saat playlist dibuka
+                for name, song_id in self.conn.execute(
+                        "SELECT playlist, song_id FROM playlist_entries "
+                        "ORDER BY playlist, position"):
+                    if song_id not in songs_by_id and song_id in orphans:
+                        playlists[name].add_entry(orphans[song_id])
+                    else:
+                        playlists[name].add_entry(song_id)
+
+            if not playlists:
+                playlists['My Favorites'] = DoublyLinkedList()
+            yield library, playlists, 1.0
+        except Exception as e:
+            raise Exception(f"Gagal memuat data: {e}")
+
+    def save_data(self, library, playlists):
+        """Tulis ulang seluruh isi database dalam satu transaksi"""
+        return self.write_snapshot(self.build_snapshot(library, playlists))
+
+    def build_snapshot(self, library, playlists):
+        """Salin data ke bentuk siap-simpan (dipanggil di thread UI)"""
+        # Operasi yang masih antre sudah tercermin di snapshot ini
+        with self._ops_lock:
+            self._pending_ops = []
+        data = {'library': [dict(s) for s in library], 'playlists': {}, 'orphans': {}}
+        
+        # Seperti DataManager: lagu playlist yang tidak ada di library disimpan utuh
+        library_ids = {s['id'] for s in library}
+        for name, playlist in playlists.items():
+            entries = playlist.to_list() if playlist.is_loaded else playlist.raw_entries()
+            for e in entries:
+                if isinstance(e, dict) and entry_id(e) not in library_ids:
+                    data['orphans'][entry_id(e)] = dict(e)
+            data['playlists'][name] = {
+                'image_path': playlist.image_path,
+                'description': playlist.description,
+                'songs': [entry_id(e) for e in entries]
+            }
+        return data
+
+    def write_snapshot(self, data):
+        try:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM playlist_entries")
+                self.conn.execute("DELETE FROM playlists")
+                self.conn.execute("DELETE FROM songs")
+                self.conn.execute("DELETE FROM orphan_songs")
+                self.conn.executemany(
+                    f"INSERT INTO songs ({', '.join(SONG_COLUMNS)}, position) "
+                    f"VALUES ({', '.join('?' * len(SONG_COLUMNS))}, ?)",
+                    (self._song_to_row(s) + (pos,)
+                     for pos, s in enumerate(data['library'])))
+                self.conn.executemany(
+                    "INSERT INTO orphan_songs (id, record) VALUES (?, ?)",
+                    ((song_id, json.dumps(song, ensure_ascii=False))
+                     for song_id, song in data.get('orphans', {}).items()))
+                for pos, (name, content) in enumerate(data['playlists'].items()):
+                    self.conn.execute(
+                        "INSERT INTO playlists (name, image_path, description, position) "
+                        "VALUES (?, ?, ?, ?)",
+                        (name, content['image_path'], content['description'] or "", pos))
+                    self.conn.executemany(
+                        "INSERT INTO playlist_entries (playlist, position, song_id) "
+                        "VALUES (?, ?, ?)",
+                        ((name, i, song_id) for i, song_id in enumerate(content['songs'])))
+            return True
+        except Exception as e:
+            raise Exception(f"Gagal menyimpan data: {e}")
+
+    def needs_compaction(self):
+        return False
+
+    # ==================== OPERASI PER BARIS ====================
+    def append_op(self, op):
+        """Catat satu operasi; dengan writer, commit-nya dijalankan di background"""
+        if self.writer is None:
+            return self.apply_op(op)
+        with self._ops_lock:
+            self._pending_ops.append(op)
+        self.writer.submit('sqlite_ops', self.flush_ops)
+    
+    def flush_ops(self):
+        """Terapkan semua operasi yang antre, sesuai urutan (dipanggil thread writer)"""
+        with self._ops_lock:
+            ops, self._pending_ops = self._pending_ops, []
+        for op in ops:
+            self.apply_op(op)
+    
+    def apply_op(self, op):
+        """Terjemahkan operasi journal menjadi penulisan per baris"""
+        kind = op['op']
+        try:
+            if kind == 'song_add':
+                self.insert_song(op['song'])
+            elif kind == 'song_update':
+                self.update_song(op['song'])
+            elif kind == 'song_delete':
+                self.delete_song(op['id'])
+            elif kind == 'library_order':
+                self.reorder_library(op['ids'])
+            elif kind == 'playlist_create':
+                self.create_playlist(op['name'], op.get('image_path'),
+                                     op.get('description', ""))
+            elif kind == 'playlist_update':
+                self.update_playlist(op['name'], op.get('new_name', op['name']),
+                                     op.get('image_path'), op.get('description'))
+            elif kind == 'playlist_delete':
+                self.delete_playlist(op['name'])
+            elif kind == 'playlist_add':
+                self.add_playlist_entry(op['name'], op['id'])
+            elif kind == 'playlist_remove':
+                self.remove_playlist_entry(op['name'], op['id'])
+            elif kind == 'playlist_order':
+                self.reorder_playlist(op['name'], op['ids'])
+            else:
+                raise ValueError(f"Operasi tidak dikenal: {kind}")
+        except Exception as e:
+            raise Exception(f"Gagal menyimpan data: {e}")
+
+    def insert_song(self, song):
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO songs ({', '.join(SONG_COLUMNS)}, position) "
+                f"VALUES ({', '.join('?' * len(SONG_COLUMNS))}, "
+                f"(SELECT COALESCE(MAX(position), -1) + 1 FROM songs))",
+                self._song_to_row(song))
+
+    def update_song(self, song):
+        columns = SONG_COLUMNS[1:]
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"UPDATE songs SET {', '.join(c + ' = ?' for c in columns)} WHERE id = ?",
+                self._song_to_row(song)[1:] + (song['id'],))
+
+    def delete_song(self, song_id):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM playlist_entries WHERE song_id = ?", (song_id,))
+            self.conn.execute("DELETE FROM songs WHERE id = ?", (song_id,))
+
+    def reorder_library(self, song_ids):
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE songs SET position = ? WHERE id = ?",
+                                  ((pos, song_id) for pos, song_id in enumerate(song_ids)))
+
+    def create_playlist(self, name, image_path=None, description=""):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO playlists (name, image_path, description, position) "
+                "VALUES (?, ?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM playlists))",
+                (name, image_path, description or ""))
+
+    def update_playlist(self, name, new_name, image_path, description=None):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE playlists SET name = ?, image_path = ?, "
+                "description = COALESCE(?, description) WHERE name = ?",
+                (new_name, image_path, description, name))
+
+    def delete_playlist(self, name):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM playlists WHERE name = ?", (name,))
+
+    def add_playlist_entry(self, name, song_id):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO playlist_entries (playlist, position, song_id) VALUES "
+                "(?, (SELECT COALESCE(MAX(position), -1) + 1 FROM playlist_entries "
+                "WHERE playlist = ?), ?)",
+                (name, name, song_id))
+
+    def remove_playlist_entry(self, name, song_id):
+        """Hapus kemunculan pertama song_id dari playlist"""
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "DELETE FROM playlist_entries WHERE playlist = ? AND position = "
+                "(SELECT MIN(position) FROM playlist_entries WHERE playlist = ? AND song_id = ?)",
+                (name, name, song_id))
+            return cur.rowcount > 0
+
+    def reorder_playlist(self, name, song_ids):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM playlist_entries WHERE playlist = ?", (name,))
+            self.conn.executemany(
+                "INSERT INTO playlist_entries (playlist, position, song_id) VALUES (?, ?, ?)",
+                ((name, i, song_id) for i, song_id in enumerate(song_ids)))
+
+    # ==================== HELPER ====================
+    @staticmethod
+    def _song_to_row(song):
+        return tuple(int(bool(song.get(c, False))) if c == 'favorite' else song.get(c)
+                     for c in SONG_COLUMNS)
+
+    @staticmethod
+    def _row_to_song(row):
+        song = dict(zip(SONG_COLUMNS, row))
+        song['favorite'] = bool(song['favorite'])
+        return song
+
+
+def migrate_json_to_sqlite(json_path='music_data.json', db_path='music_data.db'):
+    """Pindahkan data dari music_data.json (beserta journal-nya) ke SQLite"""
+    library, playlists = DataManager(json_path, journal=True).load_data()
+    manager = SQLiteDataManager(db_path)
+    try:
+        manager.save_data(library, playlists)
+    finally:
+        manager.close()
+    return len(library), len(playlists)
+
+
+if __name__ == "__main__":
+    songs, playlists = migrate_json_to_sqlite(*sys.argv[1:3])
+    print(f"Migrasi selesai: {songs} lagu, {playlists} playlist")
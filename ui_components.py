@@ -307,4 +307,467 @@ class QueueDialog:
             listbox.insert(tk.END, f"{i}. {song['title']} - {song['artist']}")
         
         tk.Button(self.dialog, text="Tutup", bg=colors['accent_dark'], 
-                fg=colors['white'], command=self.dialog.destroy).pack(pady=10)
\ No newline at end of file
+                fg=colors['white'], command=self.dialog.destroy).pack(pady=10)
+
+class PlayQueueDialog:
+    """Dialog untuk melihat dan mengatur antrean (PlayQueue)"""
+    def __init__(self, parent, colors, play_queue):
+        self.play_queue = play_queue
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Antrean Lagu")
+        self.dialog.geometry("600x450")
+        self.dialog.configure(bg=colors['bg_main'])
+        
+        tk.Label(self.dialog, text="Antrean Lagu", font=('Arial', 14, 'bold'),
+                bg=colors['bg_main'], fg=colors['text']).pack(pady=10)
+        
+        self.listbox = tk.Listbox(self.dialog, font=('Arial', 11), 
+                                 bg=colors['entry_bg'], fg=colors['text'])
+        self.listbox.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        buttons = tk.Frame(self.dialog, bg=colors['bg_main'])
+        buttons.pack(pady=10)
+        for text, command in (("⏫ Putar Berikutnya", lambda: self.move_selected(0)),
+                              ("⬆", lambda: self.move_selected(-1, relative=True)),
+                              ("⬇", lambda: self.move_selected(1, relative=True)),
+                              ("🗑 Hapus", self.remove_selected),
+                              ("Kosongkan", self.clear),
+                              ("Tutup", self.dialog.destroy)):
+            tk.Button(buttons, text=text, bg=colors['accent_dark'], fg=colors['white'],
+                     relief='flat', padx=8, command=command).pack(side='left', padx=3)
+        self.refresh()
+    
+    def refresh(self, select=None):
+        self.listbox.delete(0, tk.END)
+        for i, (song_id, song) in enumerate(self.play_queue.items(), 1):
+            text = f"{song['title']} - {song['artist']}" if song else f"(lagu {song_id} sudah dihapus)"
+            self.listbox.insert(tk.END, f"{i}. {text}")
+        if select is not None and 0 <= select < len(self.play_queue):
+            self.listbox.selection_set(select)
+            self.listbox.see(select)
+    
+    def selected(self):
+        selection = self.listbox.curselection()
+        return selection[0] if selection else None
+    
+    def move_selected(self, target, relative=False):
+        index = self.selected()
+        if index is None:
+            return
+        new_index = max(0, min(index + target if relative else target,
+                               len(self.play_queue) - 1))
+        self.play_queue.move(index, new_index)
+        self.refresh(select=new_index)
+    
+    def remove_selected(self):
+        index = self.selected()
+        if index is not None:
+            self.play_queue.remove(index)
+            self.refresh(select=min(index, len(self.play_queue) - 1))
+    
+    def clear(self):
+        if messagebox.askyesno("Konfirmasi", "Kosongkan antrean?", parent=self.dialog):
+            self.play_queue.clear()
+            self.refresh()
+
+class SongListView:
+    """Daftar lagu virtual di atas ttk.Treeview
+    
+    Hanya baris yang terlihat (ditambah beberapa baris overscan) yang
+    benar-benar ada di Treeview; posisi scrollbar dipetakan ke potongan
+    list lagu hasil filter/sort. iid setiap baris adalah ID lagu (kemunculan
+    berikutnya dari lagu yang sama di playlist diberi akhiran '#n'), dan
+    perubahan cukup ditambal lewat update_song/insert_song/remove_song/
+    move_song tanpa membangun ulang tampilan.
+    """
+    def __init__(self, tree, scrollbar, overscan=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.overscan = overscan
+        self.songs = []
+        self.offset = 0  # Index lagu pada baris paling atas
+        self.selected = None  # Index lagu yang dipilih (tetap diingat saat di-scroll)
+        self.row_height = 20
+        self.heading_height = 25
+        self.unique = True  # ID lagu dijamin tidak berulang (library)
+        self._occurrence = None  # Kemunculan ke-n tiap baris; None jika ID unik
+        self._window = {}  # iid -> index lagu untuk baris yang sedang ada di Treeview
+        
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand=lambda *args: None)
+        tree.bind('<Configure>', lambda e: self.render())
+        tree.bind('<<TreeviewSelect>>', self.on_select)
+        tree.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        tree.bind('<Button-5>', lambda e: self.scroll(3))
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page_up'),
+                          ('<Next>', 'page_down'), ('<Home>', 'home'), ('<End>', 'end')):
+            tree.bind(key, lambda e, step=step: self.move_selection(step))
+    
+    @staticmethod
+    def song_row(song):
+        icon = '⭐' if song.get('favorite', False) else '🎵'
+        return icon, (song['id'], song['title'], song['artist'],
+                      song['genre'], song['album'], song['year'], song['duration'])
+    
+    def set_songs(self, songs, unique=False):
+        """Ganti isi list (hasil refresh); kembali ke atas
+        
+        unique=True jika ID dijamin tidak berulang (library), sehingga
+        pengecekan duplikat bisa dilewati.
+        """
+        self.songs = list(songs)
+        self.unique = unique
+        self.offset = 0
+        self.selected = None
+        self._count_occurrences()
+        self.tree.delete(*self.tree.get_children())
+        self._window = {}
+        self.render()
+    
+    def _count_occurrences(self):
+        self._occurrence = None
+        if self.unique:
+            return
+        seen = {}
+        occurrence = []
+        for song in self.songs:
+            n = seen.get(song['id'], 0)
+            seen[song['id']] = n + 1
+            occurrence.append(n)
+        if len(seen) != len(self.songs):
+            self._occurrence = occurrence
+    
+    def iid(self, index):
+        song_id = str(self.songs[index]['id'])
+        if self._occurrence is None or not self._occurrence[index]:
+            return song_id
+        return f"{song_id}#{self._occurrence[index]}"
+    
+    def index_of(self, iid):
+        """Index lagu untuk baris iid (hanya baris yang sedang tampil)"""
+        return self._window.get(iid)
+    
+    def visible_rows(self):
+        height = self.tree.winfo_height()
+        if height <= 1:  # Belum tampil di layar
+            return int(self.tree.cget('height'))
+        return max(1, (height - self.heading_height) // self.row_height)
+    
+    def render(self):
+        """Samakan isi Treeview dengan potongan lagu mulai dari offset
+        
+        Baris yang masih ada di potongan baru tidak dibuat ulang; hanya
+        baris yang keluar dihapus dan baris yang masuk ditambahkan.
+        """
+        visible = self.visible_rows()
+        total = len(self.songs)
+        self.offset = max(0, min(self.offset, total - visible))
+        end = min(total, self.offset + visible + self.overscan)
+        window = {self.iid(index): index for index in range(self.offset, end)}
+        
+        tree = self.tree
+        existing = tree.get_children()
+        stale = [iid for iid in existing if iid not in window]
+        if stale:
+            tree.delete(*stale)
+        existing = set(existing).difference(stale)
+        for position, (iid, index) in enumerate(window.items()):
+            if iid not in existing:
+                text, values = self.song_row(self.songs[index])
+                tree.insert('', position, iid=iid, text=text, values=values)
+        if tree.get_children() != tuple(window):
+            for position, iid in enumerate(window):
+                tree.move(iid, '', position)
+        self._window = window
+        tree.yview_moveto(0)
+        
+        if self.selected is not None and self.offset <= self.selected < end:
+            iid = self.iid(self.selected)
+            if tree.selection() != (iid,):
+                tree.selection_set(iid)
+                tree.focus(iid)
+        if window:
+            self.measure(next(iter(window)))
+        
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def measure(self, iid):
+        """Ambil tinggi baris/heading sebenarnya dari baris yang sudah tampil"""
+        bbox = self.tree.bbox(iid)
+        if bbox:
+            self.heading_height, self.row_height = bbox[1], max(1, bbox[3])
+    
+    # ==================== UPDATE PER BARIS ====================
+    def update_song(self, song, old_id=None, visible=True, before=None):
+        """Perbarui tampilan baris lagu yang record-nya berubah
+        
+        visible=False membuang lagu yang tidak lagi cocok dengan pencarian.
+        before(a, b) (True jika a diurutkan sebelum b, lihat sort_before)
+        memindahkan lagu ke posisinya yang baru di list terurut, atau
+        menyisipkannya jika lagu baru cocok dengan pencarian.
+        """
+        moved = before is not None or not visible
+        if not moved and (old_id is None or old_id == song['id']):
+            text, values = self.song_row(song)
+            for iid, index in self._window.items():
+                if self.songs[index] is song:
+                    self.tree.item(iid, text=text, values=values)
+            return
+        
+        # Posisi atau iid berubah: buang baris lama, render membuat yang baru
+        stale = [iid for iid, index in self._window.items() if self.songs[index] is song]
+        if stale:
+            self.tree.delete(*stale)
+        if moved:
+            indexes = [i for i, s in enumerate(self.songs) if s is song]
+            selected = self.selected in indexes
+            for index in reversed(indexes):
+                self.remove_index(index, render=False)
+            if visible:
+                position = self._position(song, before)
+                for _ in range(max(1, len(indexes))):
+                    self.songs.insert(position, song)
+                    if self.selected is not None and position <= self.selected:
+                        self.selected += 1
+                if selected:
+                    self.selected = position
+        self._shifted()
+    
+    def _position(self, song, before):
+        """Index sisip song di list terurut menurut before (binary search)"""
+        low, high = 0, len(self.songs)
+        while low < high:
+            middle = (low + high) // 2
+            if before(self.songs[middle], song):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def insert_song(self, index, song):
+        """Sisipkan lagu di posisi index (len(songs) = di akhir)"""
+        self.songs.insert(index, song)
+        if self.selected is not None and index <= self.selected:
+            self.selected += 1
+        self._shifted()
+    
+    def extend(self, songs):
+        """Tambahkan beberapa lagu di akhir list (mis. batch saat loading)"""
+        self.songs.extend(songs)
+        self._shifted()
+    
+    def remove_song(self, song_id, every=False):
+        """Hapus baris pertama (atau semua baris) dengan ID song_id"""
+        indexes = [i for i, song in enumerate(self.songs) if song['id'] == song_id]
+        if not every:
+            indexes = indexes[:1]
+        for index in reversed(indexes):
+            self.remove_index(index, render=False)
+        if indexes:
+            self._shifted()
+        return bool(indexes)
+    
+    def remove_index(self, index, render=True):
+        del self.songs[index]
+        if self.selected is not None:
+            if self.selected == index:
+                self.selected = None
+            elif self.selected > index:
+                self.selected -= 1
+        if render:
+            self._shifted()
+    
+    def move_song(self, old_index, new_index):
+        """Pindahkan lagu dari old_index ke new_index"""
+        song = self.songs.pop(old_index)
+        self.songs.insert(new_index, song)
+        if self.selected == old_index:
+            self.selected = new_index
+        elif self.selected is not None:
+            if old_index < self.selected <= new_index:
+                self.selected -= 1
+            elif new_index <= self.selected < old_index:
+                self.selected += 1
+        self._shifted()
+    
+    def _shifted(self):
+        """Render ulang potongan setelah posisi lagu bergeser (offset tetap)"""
+        self._count_occurrences()
+        self.render()
+    
+    # ==================== SCROLL ====================
+    def yview(self, *args):
+        """Callback scrollbar ('moveto', fraksi) / ('scroll', n, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.songs))
+            self.render()
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            self.scroll(step * self.visible_rows() if args[2] == 'pages' else step)
+    
+    def scroll(self, rows):
+        self.offset += rows
+        self.render()
+        return 'break'
+    
+    def see(self, index):
+        """Scroll seperlunya agar lagu ke-index terlihat"""
+        visible = self.visible_rows()
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + visible:
+            self.offset = index - visible + 1
+        self.render()
+    
+    # ==================== SELEKSI ====================
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            if selection[0] in self._window:
+                self.selected = self._window[selection[0]]
+        elif self.selected is not None and self.iid(self.selected) in self._window:
+            # Seleksi dibatalkan pengguna; baris yang terhapus karena scroll tetap dipilih
+            self.selected = None
+    
+    def selected_song(self):
+        """Record lagu yang dipilih, juga saat barisnya sedang di luar layar"""
+        if self.selected is None:
+            return None
+        return self.songs[self.selected]
+    
+    def select(self, index):
+        """Pilih lagu ke-index (scroll jika perlu); kembalikan iid atau None"""
+        if not 0 <= index < len(self.songs):
+            return None
+        self.selected = index
+        self.see(index)
+        return self.iid(index)
+    
+    def move_selection(self, step):
+        if not self.songs:
+            return 'break'
+        current = self.selected if self.selected is not None else -1
+        page = self.visible_rows()
+        index = {'page_up': current - page, 'page_down': current + page,
+                 'home': 0, 'end': len(self.songs) - 1}.get(step, None)
+        if index is None:
+            index = current + step
+        self.select(max(0, min(index, len(self.songs) - 1)))
+        return 'break'
+
+
+class PlaylistSidebar:
+    """Daftar playlist di sidebar dalam Canvas yang bisa di-scroll
+    
+    Hanya baris yang terlihat (ditambah overscan) yang punya widget, dan
+    widget baris dipegang per nama playlist: set_playlists() cukup
+    memindahkan baris yang sudah ada, membuat baris untuk nama baru yang
+    terlihat, dan menyimpan baris yang tidak terpakai untuk dipakai ulang.
+    """
+    def __init__(self, parent, colors, on_open, on_options, show_menu, overscan=3):
+        self.colors = colors
+        self.on_open = on_open
+        self.on_options = on_options
+        self.show_menu = show_menu  # show_menu(nama) -> tampilkan tombol ⋮?
+        self.overscan = overscan
+        self.row_height = 36
+        self.names = []
+        self._rows = {}  # nama -> (container, tombol, tombol menu, id window canvas)
+        self._free = []  # baris tersembunyi yang bisa dipakai ulang
+        
+        self.scrollbar = ttk.Scrollbar(parent, orient='vertical')
+        self.canvas = tk.Canvas(parent, bg=colors['bg_sec'], highlightthickness=0,
+                                yscrollincrement=self.row_height)
+        self.scrollbar.configure(command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.canvas.bind('<Configure>', lambda e: self.render())
+        self.bind_wheel(self.canvas)
+    
+    def bind_wheel(self, widget):
+        widget.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        widget.bind('<Button-4>', lambda e: self.scroll(-3))
+        widget.bind('<Button-5>', lambda e: self.scroll(3))
+    
+    def set_playlists(self, names):
+        """Samakan isi sidebar dengan names (urutan dict playlist)"""
+        names = list(names)
+        if names != self.names:
+            self.names = names
+            self.canvas.configure(scrollregion=(0, 0, 0, len(names) * self.row_height))
+        self.render()
+    
+    def render(self):
+        """Buat/posisikan baris yang terlihat; sembunyikan sisanya"""
+        height = self.canvas.winfo_height()
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // self.row_height) - self.overscan)
+        last = min(len(self.names),
+                   int((top + height) // self.row_height) + 1 + self.overscan)
+        visible = self.names[first:last]
+        
+        wanted = set(visible)
+        for name in [n for n in self._rows if n not in wanted]:
+            row = self._rows.pop(name)
+            self.canvas.itemconfigure(row[3], state='hidden')
+            self._free.append(row)
+        
+        width = self.canvas.winfo_width()
+        for i, name in enumerate(visible, first):
+            row = self._rows.get(name)
+            if row is None:
+                row = self._free.pop() if self._free else self._make_row()
+                self._fill(row, name)
+                self._rows[name] = row
+                self.canvas.itemconfigure(row[3], state='normal')
+            self.canvas.coords(row[3], 0, i * self.row_height)
+            self.canvas.itemconfigure(row[3], width=width)
+    
+    def _make_row(self):
+        container = tk.Frame(self.canvas, bg=self.colors['bg_sec'])
+        btn = tk.Button(container, font=('Arial', 10), bg=self.colors['accent_dark'],
+                        fg=self.colors['white'], relief='flat', anchor='w',
+                        padx=20, pady=4)
+        btn.pack(side='left', fill='x', expand=True, pady=3)
+        menu_btn = tk.Button(container, text="⋮", font=('Arial', 14),
+                             bg=self.colors['bg_sec'], fg=self.colors['text_sec'],
+                             relief='flat', width=2, cursor='hand2')
+        for widget in (container, btn, menu_btn):
+            self.bind_wheel(widget)
+        window = self.canvas.create_window(0, 0, window=container, anchor='nw',
+                                           height=self.row_height)
+        return container, btn, menu_btn, window
+    
+    def _fill(self, row, name):
+        _, btn, menu_btn, _ = row
+        btn.config(text="🎶 " + name, command=lambda: self.on_open(name))
+        menu_btn.config(command=lambda: self.on_options(name))
+        if self.show_menu(name):
+            menu_btn.pack(side='right', padx=2)
+        else:
+            menu_btn.pack_forget()
+    
+    # ==================== SCROLL ====================
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.render()
+    
+    def scroll(self, rows):
+        self.canvas.yview_scroll(rows, 'units')
+    
+    def see(self, name):
+        """Scroll sampai playlist name terlihat"""
+        if name not in self.names or not self.names:
+            return
+        index = self.names.index(name)
+        top = self.canvas.canvasy(0) // self.row_height
+        visible = max(1, self.canvas.winfo_height() // self.row_height)
+        if index < top:
+            self.canvas.yview_moveto(index / len(self.names))
+        elif index >= top + visible:
+            self.canvas.yview_moveto((index - visible + 1) / len(self.names))
@@ -2,7 +2,11 @@
 import tkinter as tk
 from tkinter import messagebox
 import random
-from ui_components import QueueDialog
+from collections import Counter
+from itertools import islice
+from columnar import normalize
+from ui_components import QueueDialog, PlayQueueDialog
+from playback import PlayedIds, ShuffleOrder
 
 class UserController:
     """Controller untuk fitur user"""
@@ -11,40 +15,46 @@ class UserController:
         self.last_context_song = None
     
     def add_to_history(self, song_id):
-        """Tambah ke history, jaga max 10 items"""
-        # Jangan tambah jika sama dengan yang terakhir (mencegah duplikat berurutan)
-        if self.app.played_history and self.app.played_history[-1] == song_id:
-            return
-        
-        self.app.played_history.append(song_id)
-        if len(self.app.played_history) > 50:
-            self.app.played_history.pop(0)
+        """Tambah ke history (lihat PlayHistory); duplikat berurutan diabaikan"""
+        self.app.played_history.push(song_id)
             
     def show_history(self):
         """Tampilkan riwayat lagu"""
         history_songs = []
         for song_id in reversed(self.app.played_history): # Show newest first
-            song = next((s for s in self.app.library if s['id'] == song_id), None)
+            song = self.app.song_index.get(song_id)
             if song:
                 history_songs.append(song)
         
         QueueDialog(self.app.root, "Riwayat Lagu", 
                    self.app.colors, history_songs)
     
+    def show_library_stats(self, top=5):
+        """Tampilkan jumlah lagu per genre dan artis teratas"""
+        lines = [f"Total: {len(self.app.library)} lagu"]
+        for field, label in (('genre', 'Genre'), ('artist', 'Artis')):
+            if self.app.columns:
+                counts = self.app.columns.count_by(field)
+            else:
+                counts = Counter(normalize(s.get(field)) for s in self.app.library)
+            ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+            lines.append(f"\n{label} teratas:")
+            lines += [f"  {value.strip() or '-'}: {count} lagu" for value, count in ranked]
+        messagebox.showinfo("Statistik Library", "\n".join(lines))
+    
     def play_selected_song(self):
         """Putar lagu yang dipilih"""
-        selection = self.app.tree.selection()
-        if not selection:
+        selected = self.app.song_list.selected_song()
+        if not selected:
             return
         
-        values = self.app.tree.item(selection[0])['values']
-        song_id = values[0]
+        song_id = selected['id']
         
         if self.app.current_view == 'library':
-            song = next((s for s in self.app.library if s['id'] == song_id), None)
+            song = self.app.song_index.get(song_id)
         else:
-            songs = self.app.playlists[self.app.selected_playlist].to_list()
-            song = next((s for s in songs if s['id'] == song_id), None)
+            node = self.app.playlists[self.app.selected_playlist].find_node(song_id)
+            song = node.data if node else None
         
         if song:
             self.app.current_song = song
@@ -58,15 +68,13 @@ class UserController:
         """Toggle play/pause"""
         if not self.app.current_song:
             # Jika belum ada lagu yang diputar, coba putar yang dipilih
-            selection = self.app.tree.selection()
-            if selection:
+            if self.app.song_list.selected_song():
                 self.play_selected_song()
                 return
             
             # Jika tidak ada seleksi, coba putar lagu pertama (auto-start)
-            children = self.app.tree.get_children()
-            if children:
-                first_item = children[0]
+            first_item = self.app.song_list.select(0)
+            if first_item:
                 self.app.tree.selection_set(first_item)
                 self.play_selected_song()
                 return
@@ -82,44 +90,18 @@ class UserController:
     
     def play_all(self):
         """Putar semua lagu (mulai dari pertama) di view saat ini"""
-        children = self.app.tree.get_children()
-        if not children:
+        # Select first item (list virtual: scroll ke atas jika perlu)
+        first_item = self.app.song_list.select(0)
+        if not first_item:
             messagebox.showwarning("Peringatan", "Tidak ada lagu untuk diputar!")
             return
         
-        # Select first item
-        first_item = children[0]
         self.app.tree.selection_set(first_item)
         self.app.tree.focus(first_item)
         
         # Play it
         self.play_selected_song()
     
-    def get_smart_recommendation(self, current_song, candidates):
-        """Cari lagu berdasarkan prioritas: Artist > Album > Genre > Year > Alphabetical"""
-        # Prioritas 1: Artist
-        same = [s for s in candidates if s['artist'] == current_song['artist']]
-        if same: return same[0]
-        
-        # Prioritas 2: Album
-        same = [s for s in candidates if s.get('album') == current_song.get('album')]
-        if same: return same[0]
-        
-        # Prioritas 3: Genre
-        same = [s for s in candidates if s['genre'] == current_song['genre']]
-        if same: return same[0]
-        
-        # Prioritas 4: Year (Decade logic removed, strictly year or just close year?)
-        # User said "tahun yang sama", so strictly same year.
-        same = [s for s in candidates if s['year'] == current_song['year']]
-        if same: return same[0]
-        
-        # Fallback: Urutan abjad judul (candidates sudah disort di caller)
-        if candidates:
-            return candidates[0]
-        
-        return None
-    
     def next_song(self):
         """Putar lagu selanjutnya"""
         if not self.app.current_song:
@@ -127,14 +109,19 @@ class UserController:
             return
         
         # Cek queue dulu
-        if self.app.play_queue:
-            self.app.current_song = self.app.play_queue.pop(0)
+        queued = self.app.play_queue.popleft()
+        if queued:
+            self.app.current_song = queued
             self.app.is_playing = True
             self.add_to_history(self.app.current_song['id'])
             self.app.update_player_ui()
             messagebox.showinfo("Queue", f"🎵 Dari antrean: {self.app.current_song['title']}")
             return
         
+        if self.app.shuffle_mode:
+            self.play_shuffled()
+            return
+        
         if self.app.current_view == 'playlist' and self.app.selected_playlist:
             # Next dari playlist
             # Coba cari current song di playlist. Jika tidak ada (krn dr queue), gunakan last_context_song
@@ -158,30 +145,8 @@ class UserController:
                 return
         
         # LIBRARY LOGIC (Smart Recommendation)
-        
-        # Determine anchor song for recommendation
-        anchor_song = self.app.current_song
-        # If current song was from queue (detached from library flow), use last context if possible
-        if self.last_context_song:
-             anchor_song = self.last_context_song
-             
-        # Siapkan candidates dari library (yang belum diputar)
-        candidates = [s for s in self.app.library 
-                     if s['id'] not in self.app.played_history 
-                     and s['id'] != self.app.current_song['id']]
-        
-        # Jika semua sudah diputar, reset cycle (hapus history, kecuali current)
-        if not candidates:
-            # self.app.played_history = [self.app.current_song['id']]
-            # candidates = [s for s in self.app.library if s['id'] != self.app.current_song['id']]
-            messagebox.showinfo("Info", "Semua lagu di library sudah diputar!")
-            return
-        
-        # Sort candidates berdasarkan Judul (Alphabetical) untuk fallback
-        candidates.sort(key=lambda x: x['title'].lower())
-        
-        # Cari rekomendasi smart based on ANCHOR
-        next_s = self.get_smart_recommendation(anchor_song, candidates)
+        # Biasanya sudah dihitung prefetcher saat lagu ini mulai diputar
+        next_s = self.app.prefetcher.recommendation()
         
         if next_s:
             self.app.current_song = next_s
@@ -194,7 +159,76 @@ class UserController:
             self.app.update_player_ui()
             # messagebox.showinfo("Next", f"🎵 {self.app.current_song['title']} - {self.app.current_song['artist']}")
         else:
-            messagebox.showinfo("Info", "Tidak ada lagu lain yang tersedia!")
+            messagebox.showinfo("Info", "Semua lagu di library sudah diputar!")
+    
+    # ==================== SHUFFLE ====================
+    def shuffle_order(self):
+        """ShuffleOrder untuk view saat ini; sesi baru dimulai jika view berganti"""
+        if self.app.current_view == 'playlist' and self.app.selected_playlist in self.app.playlists:
+            context = ('playlist', self.app.selected_playlist)
+        else:
+            context = ('library', None)
+        if self.app.shuffle is None or self.app.shuffle_context != context:
+            if context[0] == 'playlist':
+                playlist = self.app.playlists[context[1]]
+                # Entri mentah dibaca langsung; node yang sudah dibangun tidak bisa
+                # diakses per posisi, jadi hanya playlist itu yang disalin
+                entries = playlist.to_list() if playlist.is_loaded else playlist.raw_entries()
+            else:
+                entries = self.app.library
+            seed = self.app.shuffle_seed
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            current = self.app.current_song
+            # Lagu yang sedang diputar menjadi awal urutan (tujuan terakhir tombol Previous)
+            self.app.shuffle = ShuffleOrder(entries, seed, current['id'] if current else None)
+            self.app.shuffle_context = context
+        return self.app.shuffle
+    
+    def play_shuffled(self, backward=False):
+        """Putar lagu berikutnya/sebelumnya dalam urutan acak"""
+        shuffle = self.shuffle_order()
+        step = shuffle.prev if backward else shuffle.next
+        song_id = step()
+        while song_id is not None and song_id not in self.app.song_index:
+            song_id = step()  # Entri playlist yang lagunya sudah tidak ada
+        
+        if song_id is None:
+            if backward:
+                messagebox.showinfo("Info", "Sudah di awal urutan acak!")
+            else:
+                messagebox.showinfo("Info", "Semua lagu sudah diputar dalam mode acak!")
+            return
+        
+        self.app.current_song = self.app.song_index[song_id]
+        self.last_context_song = self.app.current_song
+        self.app.is_playing = True
+        if not backward:
+            self.add_to_history(song_id)
+        self.app.update_player_ui()
+    
+    def recommend_next(self):
+        """Lagu library berikutnya untuk next_song (None jika semua sudah diputar)"""
+        # Determine anchor song for recommendation
+        anchor_song = self.app.current_song
+        # If current song was from queue (detached from library flow), use last context if possible
+        if self.last_context_song:
+             anchor_song = self.last_context_song
+             
+        # Lagu yang sudah diputar tidak direkomendasikan lagi
+        played = PlayedIds(self.app.played_history, self.app.current_song['id'])
+        
+        if self.app.similar_recommend and self.app.similarity:
+            # Campuran beberapa lagu terakhir, anchor sebagai yang terbaru
+            recent = islice(reversed(self.app.played_history), self.app.recommend_blend)
+            anchors = [song_id for song_id in reversed(list(recent))
+                       if song_id != anchor_song['id']]
+            anchors.append(anchor_song['id'])
+            best = self.app.similarity.recommend(anchors[-self.app.recommend_blend:], played, top_k=1)
+            return best[0] if best else None
+        
+        # Cari rekomendasi smart based on ANCHOR (lihat recommender.py)
+        return self.app.recommender.recommend(anchor_song, played)
     
     def prev_song(self):
         """Putar lagu sebelumnya"""
@@ -202,6 +236,10 @@ class UserController:
             messagebox.showwarning("Peringatan", "Tidak ada lagu yang sedang diputar!")
             return
         
+        if self.app.shuffle_mode:
+            self.play_shuffled(backward=True)
+            return
+        
         if self.app.current_view == 'playlist' and self.app.selected_playlist:
             # Prev dari playlist
             node = self.app.playlists[self.app.selected_playlist].find_node(self.app.current_song['id'])
@@ -224,7 +262,7 @@ class UserController:
              self.app.played_history.pop()
              # Get prev song
              prev_id = self.app.played_history[-1]
-             prev_song = next((s for s in self.app.library if s['id'] == prev_id), None)
+             prev_song = self.app.song_index.get(prev_id)
              
              if prev_song:
                  self.app.current_song = prev_song
@@ -235,10 +273,8 @@ class UserController:
 
         # Jika history kosong (atau cuma 1), gunakan smart logic? 
         # Atau fallback ke random/smart logic tapi tanpa filter history (bisa ulang).
-        candidates = [s for s in self.app.library if s['id'] != self.app.current_song['id']]
-        candidates.sort(key=lambda x: x['title'].lower())
-        
-        prev_song = self.get_smart_recommendation(self.app.current_song, candidates)
+        prev_song = self.app.recommender.recommend(self.app.current_song,
+                                                   {self.app.current_song['id']})
         
         if prev_song:
             self.app.current_song = prev_song
@@ -251,55 +287,78 @@ class UserController:
         else:
             messagebox.showinfo("Info", "Tidak ada lagu lain!")
     
-    def add_to_queue(self):
-        """Tambah lagu ke queue"""
-        selection = self.app.tree.selection()
-        if not selection:
+    def add_to_queue(self, next_up=False):
+        """Tambah lagu ke queue (next_up=True: diputar setelah lagu ini)"""
+        selected = self.app.song_list.selected_song()
+        if not selected:
             return
         
-        song_id = self.app.tree.item(selection[0])['values'][0]
-        song = next((s for s in self.app.library if s['id'] == song_id), None)
+        song_id = selected['id']
+        song = self.app.song_index.get(song_id)
         
         if song:
-            self.app.play_queue.append(song.copy())
-            messagebox.showinfo("Queue", f"'{song['title']}' ditambahkan ke antrean!")
+            if next_up:
+                self.app.play_queue.play_next(song_id)
+                messagebox.showinfo("Queue", f"'{song['title']}' diputar berikutnya!")
+            else:
+                self.app.play_queue.enqueue(song_id)
+                messagebox.showinfo("Queue", f"'{song['title']}' ditambahkan ke antrean!")
+    
+    def add_view_to_queue(self):
+        """Tambah semua lagu yang sedang ditampilkan (playlist/hasil pencarian) ke queue"""
+        songs = self.app.song_list.songs
+        if not songs:
+            messagebox.showwarning("Peringatan", "Tidak ada lagu untuk ditambahkan!")
+            return
+        self.app.play_queue.extend(s['id'] for s in songs)
+        messagebox.showinfo("Queue", f"{len(songs)} lagu ditambahkan ke antrean!")
     
     def show_queue(self):
         """Tampilkan dialog queue"""
-        QueueDialog(self.app.root, "Antrean Lagu", self.app.colors, self.app.play_queue)
+        PlayQueueDialog(self.app.root, self.app.colors, self.app.play_queue)
     
     def toggle_favorite(self):
         """Toggle status favorite lagu"""
-        selection = self.app.tree.selection()
-        if not selection:
+        selected = self.app.song_list.selected_song()
+        if not selected:
             return
         
-        song_id = self.app.tree.item(selection[0])['values'][0]
-        song = next((s for s in self.app.library if s['id'] == song_id), None)
+        song_id = selected['id']
+        song = self.app.song_index.get(song_id)
         
         if song:
+            # Playlist memakai record yang sama, jadi cukup ubah satu record
             song['favorite'] = not song.get('favorite', False)
             
-            # Update status favorite di SEMUA playlist
-            for playlist in self.app.playlists.values():
-                current_node = playlist.head
-                while current_node:
-                    if current_node.data['id'] == song_id:
-                        current_node.data['favorite'] = song['favorite']
-                    current_node = current_node.next
-            
             # Jika ditambahkan ke favorite, masukkan ke playlist My Favorites
             if song['favorite']:
                 # Cek apakah sudah ada di playlist My Favorites
-                my_favs = self.app.playlists['My Favorites'].to_list()
-                if not any(s['id'] == song_id for s in my_favs):
-                    self.app.playlists['My Favorites'].append(song.copy())
+                if song_id not in self.app.playlists['My Favorites']:
+                    self.app.playlists['My Favorites'].append(song)
+                    playlist_op = {'op': 'playlist_add', 'name': 'My Favorites', 'id': song_id}
+                    changed = {'added': song_id}
+                else:
+                    playlist_op = None
+                    changed = {}
                 status_msg = "ditambahkan ke favorite dan playlist My Favorites!"
             else:
                 # Jika dihapus dari favorite, hapus dari playlist My Favorites
                 self.app.playlists['My Favorites'].remove(song_id)
+                playlist_op = {'op': 'playlist_remove', 'name': 'My Favorites', 'id': song_id}
+                changed = {'removed': song_id}
                 status_msg = "dihapus dari favorite dan playlist My Favorites!"
             
-            self.app.save_to_json()
-            self.app.refresh_song_list()
+            self.app.playlist_changed('My Favorites', **changed)
+            ops = [{'op': 'song_update', 'song': song}]
+            if playlist_op:
+                ops.append(playlist_op)
+            self.app.save_to_json(*ops)
+            
+            # Tambal baris yang berubah saja (seleksi & posisi scroll tetap)
+            self.app.song_list.update_song(song)
+            if self.app.current_view == 'playlist' and self.app.selected_playlist == 'My Favorites':
+                if not song['favorite']:
+                    self.app.song_list.remove_song(song_id)
+                elif playlist_op:
+                    self.app.refresh_song_list()
             messagebox.showinfo("Favorite", f"Lagu {status_msg}")
\ No newline at end of file